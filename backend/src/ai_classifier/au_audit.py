@@ -116,18 +116,22 @@ def _load_existing_csv_results(csv_path: Path) -> List[Dict[str, str]]:
 def clear_audit_markers(grouped_folder: Path, clear_run_metadata: bool = True) -> int:
     """Remove all .audit_complete marker files from job folders."""
     removed = 0
-    for job_folder in grouped_folder.iterdir():
-        if job_folder.is_dir() and job_folder.name.startswith("job_"):
-            marker = job_folder / AUDIT_COMPLETE_MARKER
-            if marker.exists():
-                marker.unlink()
-                removed += 1
+    with os.scandir(grouped_folder) as it:
+        for entry in it:
+            if entry.name.startswith("job_") and entry.is_dir(follow_symlinks=False):
+                # Unlink directly - a missing marker is the common case, no exists() stat needed
+                try:
+                    os.unlink(os.path.join(entry.path, AUDIT_COMPLETE_MARKER))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
     
     if clear_run_metadata:
-        metadata_file = grouped_folder / RUN_METADATA_FILE
-        if metadata_file.exists():
-            metadata_file.unlink()
+        try:
+            os.unlink(grouped_folder / RUN_METADATA_FILE)
             print("🧹 Cleared run metadata (will create new run folder)", flush=True)
+        except FileNotFoundError:
+            pass
     
     print(f"🧹 Removed {removed} audit markers from {grouped_folder}", flush=True)
     return removed
@@ -140,7 +144,7 @@ def get_audit_status(grouped_folder: Path) -> Dict[str, Any]:
     
     for job_folder in sorted(grouped_folder.iterdir()):
         if job_folder.is_dir() and job_folder.name.startswith("job_"):
-            job_id = job_folder.name.replace("job_", "")
+            job_id = job_folder.name.removeprefix("job_")
             marker = job_folder / AUDIT_COMPLETE_MARKER
             if marker.exists():
                 completed.append(job_id)
@@ -1133,7 +1137,7 @@ async def process_grouped_jobs_au(grouped_folder: Path, broker_name: str = "", r
 
     async def process_job(folder: Path):
         async with semaphore:
-            job_id = folder.name.replace("job_", "")
+            job_id = folder.name.removeprefix("job_")
 
             # Always skip completed jobs (resume support)
             if (folder / AUDIT_COMPLETE_MARKER).exists():
@@ -215,8 +215,7 @@ def load_checklist(region: Region) -> ChecklistConfiguration:
             f"Checklist file not found for region {region}: {checklist_path}"
         )
     
-    with open(checklist_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = json.loads(checklist_path.read_bytes())
     
     # Parse and validate using Pydantic
     config = ChecklistConfiguration(**data)
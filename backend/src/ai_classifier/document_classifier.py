@@ -3,8 +3,9 @@ Document classifier using PydanticAI and Gemini 2.5 Flash for identifying custom
 """
 from __future__ import annotations
 
+import hashlib
 import os
-from typing import Literal
+from typing import Dict, Literal, Tuple
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent, BinaryContent
 from pydantic_ai.models.google import GoogleModel
@@ -84,6 +85,11 @@ def _get_document_classifier_agent() -> Agent:
 # Global agent instance (created once)
 _classifier_agent: Agent | None = None
 
+# Classifications keyed by (sha256 of PDF, filename) - the filename is part of the prompt.
+# Re-runs and duplicate scans skip the LLM call; oldest entries are evicted past the cap.
+_CLASSIFY_CACHE: Dict[Tuple[bytes, str], DocumentClassificationOutput] = {}
+CLASSIFY_CACHE_MAX = 4096
+
 
 def get_classifier_agent() -> Agent:
     """Get or create the classifier agent (singleton pattern)."""
@@ -104,6 +110,11 @@ async def classify_document(pdf_content: bytes, filename: str) -> DocumentClassi
     Returns:
         DocumentClassificationOutput with document_type
     """
+    cache_key = (hashlib.sha256(pdf_content).digest(), filename)
+    cached = _CLASSIFY_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
     agent = get_classifier_agent()
     
     # Build message parts list (text + binary content)
@@ -130,6 +141,9 @@ Return the classification in the required JSON format with document_type.
     # Run the agent with the message parts
     result = await agent.run(message_parts)
     
+    if len(_CLASSIFY_CACHE) >= CLASSIFY_CACHE_MAX:
+        _CLASSIFY_CACHE.pop(next(iter(_CLASSIFY_CACHE)))
+    _CLASSIFY_CACHE[cache_key] = result.output
     return result.output
 
 
@@ -4,6 +4,8 @@ File management module for organizing and storing classified documents.
 import os
 import re
 import json
+import shutil
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
@@ -15,10 +17,18 @@ _default_output = "/app/output" if os.path.exists("/app") else "../output"
 OUTPUT_BASE_DIR = Path(os.getenv("OUTPUT_DIRECTORY", _default_output))
 
 
+# Last run number handed out per day, so the output folder is scanned once per day
+_last_run_numbers: Dict[str, int] = {}
+_run_id_lock = threading.Lock()
+
+
 def get_next_run_id() -> str:
     """
     Generate next run ID for today in format: YYYY-MM-DD_run_NNN
     
+    The run directory is reserved (created) here, so two batches starting at
+    the same time never share a run ID.
+    
     Returns:
         Run ID string like "2025-10-13_run_001"
     """
@@ -26,19 +36,30 @@ def get_next_run_id() -> str:
     
     # Ensure output directory exists
     OUTPUT_BASE_DIR.mkdir(parents=True, exist_ok=True)
-     
-    # Find existing runs for today
+    
+    with _run_id_lock:
+        if today not in _last_run_numbers:
+            _last_run_numbers[today] = _max_run_number(today)
+        
+        while True:
+            _last_run_numbers[today] += 1
+            run_id = f"{today}_run_{_last_run_numbers[today]:03d}"
+            try:
+                (OUTPUT_BASE_DIR / run_id).mkdir()
+            except FileExistsError:
+                continue  # Taken by another process - try the next number
+            return run_id
+
+
+def _max_run_number(today: str) -> int:
+    """Find the highest existing run number for a day in the output folder."""
     existing_runs = []
     for folder in OUTPUT_BASE_DIR.iterdir():
         if folder.is_dir() and folder.name.startswith(today):
             match = re.match(rf"{today}_run_(\d+)", folder.name)
             if match:
                 existing_runs.append(int(match.group(1)))
-    
-    # Get next run number
-    next_run = max(existing_runs, default=0) + 1
-    
-    return f"{today}_run_{next_run:03d}"
+    return max(existing_runs, default=0)
 
 
 def create_run_directory(run_id: str) -> Path:
@@ -94,19 +115,47 @@ def save_classified_file(
         Input: "2219477116_AWB_OSA_OAA_8VD_20250929_132113.pdf"
         Output: "2219477116_AWB_OSA_OAA_8VD_20250929_132113_air_waybill.pdf"
     """
-    # Remove .pdf extension
-    base_name = original_filename.rsplit('.', 1)[0] if '.' in original_filename else original_filename
-    
-    # Add document type label
-    new_filename = f"{base_name}_{document_type}.pdf"
-    
     # Save file
-    file_path = job_path / new_filename
+    file_path = job_path / _classified_filename(original_filename, document_type)
     file_path.write_bytes(file_content)
     
     return file_path
 
 
+def save_classified_file_from_path(
+    source_path: Path,
+    document_type: str,
+    job_path: Path
+) -> Path:
+    """
+    Copy a local file into the job directory with its document type label.
+    
+    Same naming as save_classified_file, but the bytes are copied file-to-file
+    (shutil.copyfile uses sendfile on Linux) instead of written from memory.
+    
+    Args:
+        source_path: Path to the original file on disk
+        document_type: Classified document type (e.g., "air_waybill")
+        job_path: Path to the job directory
+        
+    Returns:
+        Path to the saved file
+    """
+    file_path = job_path / _classified_filename(source_path.name, document_type)
+    shutil.copyfile(source_path, file_path)
+    
+    return file_path
+
+
+def _classified_filename(original_filename: str, document_type: str) -> str:
+    """Build "<name without extension>_<document_type>.pdf"."""
+    # Remove .pdf extension
+    base_name = original_filename.rsplit('.', 1)[0] if '.' in original_filename else original_filename
+    
+    # Add document type label
+    return f"{base_name}_{document_type}.pdf"
+
+
 def save_extraction_json(
     extracted_data: Dict[str, Any],
     original_filename: str,
@@ -274,8 +274,10 @@ app.include_router(au_router)
 app.include_router(nz_router)
 
 # Mount batch processing routes
-from .routes.batch import router as batch_router
+from .routes.batch import router as batch_router, start_batch_logging, stop_batch_logging
 app.include_router(batch_router)
+app.router.add_event_handler("startup", start_batch_logging)
+app.router.add_event_handler("shutdown", stop_batch_logging)
 
 # Mount checklist management routes
 from .routes.checklist import router as checklist_router
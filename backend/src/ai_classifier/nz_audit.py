@@ -15,14 +15,24 @@ Three core concepts:
 from __future__ import annotations
 
 import os
+import sys
+import atexit
 import csv
+import io
 import shutil
+import zipfile
 import asyncio
+import functools
+import itertools
+import operator
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Literal
-from collections import defaultdict
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from pydantic_ai import Agent, BinaryContent
 from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.providers.google import GoogleProvider
@@ -30,8 +40,8 @@ from pydantic_ai.providers.google import GoogleProvider
 from .file_manager import get_next_run_id, create_run_directory, create_job_directory
 from .util.batch_processor import safe_copy_file
 
-# Maximum number of concurrent job workers
-MAX_CONCURRENT_JOBS = 50
+# Maximum number of concurrent job workers (override with NZ_AUDIT_CONCURRENCY)
+MAX_CONCURRENT_JOBS = int(os.getenv("NZ_AUDIT_CONCURRENCY", "50"))
 
 # Retry settings for transient API failures
 MAX_RETRIES = 3
@@ -40,16 +50,30 @@ RETRY_BASE_DELAY = 5  # seconds (exponential backoff: 5s, 10s, 20s)
 # Marker file to indicate a job was successfully audited
 AUDIT_COMPLETE_MARKER = ".audit_complete"
 
+# Number of completed-job markers buffered before they are written to disk
+MARKER_FLUSH_INTERVAL = 16
+
 # Metadata file to track the run for a grouped folder
 RUN_METADATA_FILE = ".nz_audit_run.json"
 
 # Progress file to track batch processing progress
 PROGRESS_FILE = ".nz_audit_progress.json"
 
+# Per-validation log lines are only printed when NZ_AUDIT_VERBOSE=1
+_VERBOSE = os.getenv("NZ_AUDIT_VERBOSE") == "1"
+
+# Whitespace runs collapsed by normalize_broker_name
+_WS_RE = re.compile(r'\s+')
+
+# Characters Excel does not allow in sheet names
+_SHEET_INVALID_RE = re.compile(r'[\\/?*\[\]:]')
+
+# Write buffer for CSV/XLSX output files (fewer, larger write syscalls)
+_IO_BUFFER_SIZE = 1 << 20
+
 
 def _save_run_metadata(grouped_folder: Path, run_id: str, run_path: Path, csv_path: Path | None, xlsx_path: Path | None = None) -> None:
     """Save run metadata to the grouped folder for resume capability."""
-    import json
     metadata = {
         "run_id": run_id,
         "run_path": str(run_path.resolve() if isinstance(run_path, Path) else run_path),
@@ -58,16 +82,15 @@ def _save_run_metadata(grouped_folder: Path, run_id: str, run_path: Path, csv_pa
         "updated_at": __import__("datetime").datetime.now().isoformat()
     }
     metadata_file = grouped_folder / RUN_METADATA_FILE
-    metadata_file.write_text(json.dumps(metadata, indent=2))
+    metadata_file.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
 
 def _load_run_metadata(grouped_folder: Path) -> Dict[str, Any] | None:
     """Load run metadata from the grouped folder if it exists."""
-    import json
     metadata_file = grouped_folder / RUN_METADATA_FILE
     if metadata_file.exists():
         try:
-            return json.loads(metadata_file.read_text())
+            return orjson.loads(metadata_file.read_bytes())
         except Exception:
             return None
     return None
@@ -163,7 +186,7 @@ def get_audit_status(grouped_folder: Path) -> Dict[str, Any]:
     
     for job_folder in sorted(grouped_folder.iterdir()):
         if job_folder.is_dir() and job_folder.name.startswith("job_"):
-            job_id = job_folder.name.replace("job_", "")
+            job_id = job_folder.name.removeprefix("job_")
             marker = job_folder / AUDIT_COMPLETE_MARKER
             if marker.exists():
                 completed.append(job_id)
@@ -187,6 +210,43 @@ def get_audit_status(grouped_folder: Path) -> Dict[str, Any]:
 # Validation status type
 ValidationStatus = Literal["Yes", "No", "N/A"]
 
+# Interned validation status values - validated fields are normalized to these
+# exact objects so row counters can use identity checks instead of str compares
+_NO = sys.intern("No")
+_NA = sys.intern("N/A")
+
+# Header validation status fields (in CSV column order)
+_VALIDATION_STATUS_FIELDS = (
+    "client_code_name_correct",
+    "supplier_or_cnee_correct",
+    "invoice_number_correct",
+    "vfd_correct",
+    "currency_correct",
+    "incoterm_correct",
+    "freight_zero_if_inclusive_incoterm",
+    "freight_correct",
+    "relationship_indicator_correct",
+    "country_of_export_correct",
+    "correct_weight_of_goods",
+    "cgo_correct",
+)
+
+# (label, status field, reasoning field) for verbose header validation logging
+_HV_LOG_FIELDS = (
+    ("Client code/name", "client_code_name_correct", "client_code_name_reasoning"),
+    ("Supplier/Cnee", "supplier_or_cnee_correct", "supplier_or_cnee_reasoning"),
+    ("Invoice Number", "invoice_number_correct", "invoice_number_reasoning"),
+    ("VFD", "vfd_correct", "vfd_reasoning"),
+    ("Currency", "currency_correct", "currency_reasoning"),
+    ("Incoterm", "incoterm_correct", "incoterm_reasoning"),
+    ("Freight Zero", "freight_zero_if_inclusive_incoterm", "freight_zero_reasoning"),
+    ("Freight Correct", "freight_correct", "freight_correct_reasoning"),
+    ("Relationship", "relationship_indicator_correct", "relationship_indicator_reasoning"),
+    ("Country of Export", "country_of_export_correct", "country_of_export_reasoning"),
+    ("Weight Correct", "correct_weight_of_goods", "correct_weight_reasoning"),
+    ("CGO Correct", "cgo_correct", "cgo_reasoning"),
+)
+
 
 class NZAuditExtraction(BaseModel):
     """
@@ -210,6 +270,9 @@ class NZAuditHeaderValidation(BaseModel):
     These checks compare data across documents (entry print, invoice, AWB).
     Each validation includes a reasoning field explaining the decision.
     """
+    # Keep assigned statuses interned too (create_csv_row compares by identity)
+    model_config = ConfigDict(validate_assignment=True)
+
     # Header validations with reasoning
     client_code_name_correct: ValidationStatus = Field(
         ..., 
@@ -319,6 +382,12 @@ class NZAuditHeaderValidation(BaseModel):
         description="Brief explanation for CGO validation"
     )
 
+    @field_validator(*_VALIDATION_STATUS_FIELDS)
+    @classmethod
+    def intern_status(cls, v: str) -> str:
+        """Intern status values so they are identical to _NO/_NA."""
+        return sys.intern(v)
+
 
 class NZAuditResult(BaseModel):
     """
@@ -467,17 +536,29 @@ Return your result in the exact JSON format specified.
 """
 
 
-# Cache for agent
-_nz_audit_agent: Agent | None = None
+# Per-job user prompt pieces: HEAD + job_id + INSTRUCTIONS + [BROKER + broker_name] + TAIL
+_PROMPT_HEAD = "\nAnalyze ALL the following PDF documents for Job "
+_PROMPT_INSTRUCTIONS = """ and:
+1. Extract the required audit metadata
+2. Perform header-level validations
+
+"""
+_PROMPT_BROKER = "Broker name (if not found in documents): "
+_PROMPT_TAIL = """
+
+**IMPORTANT REMINDERS**:
+- ONLY extract information that is explicitly visible in the documents
+- DO NOT make up, guess, or fabricate any information
+- If a field cannot be found, leave it empty
+- Leave date_audited as an empty string (will be filled manually)
+
+The documents are attached below. Analyze them ALL together to cross-reference information.
+"""
 
 
+@functools.cache
 def _get_nz_audit_agent() -> Agent:
     """Instantiate (or return cached) Gemini agent for NZ audit."""
-    global _nz_audit_agent  # noqa: PLW0603
-    
-    if _nz_audit_agent is not None:
-        return _nz_audit_agent
-    
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise EnvironmentError("GEMINI_API_KEY environment variable is required for Gemini agent")
@@ -487,7 +568,7 @@ def _get_nz_audit_agent() -> Agent:
         provider=GoogleProvider(api_key=api_key),
     )
 
-    _nz_audit_agent = Agent(
+    return Agent(
         model=model,
         instructions=_NZ_AUDIT_SYSTEM_PROMPT,
         output_type=NZAuditBatchOutput,
@@ -497,8 +578,111 @@ def _get_nz_audit_agent() -> Agent:
             "temperature": 0.1
         },
     )
+
+
+@dataclass(frozen=True, slots=True)
+class JobDescriptor:
+    """A job_* folder of a grouped folder, scanned once at batch start."""
+    job_id: str
+    folder: Path
+    marker: Path
+    pdfs: tuple[Path, ...]
+    completed: bool
+
+
+def _discover_jobs(grouped_folder: Path) -> List[JobDescriptor]:
+    """
+    List a grouped folder's job folders in name order, reading each one's
+    PDF files and completion marker in a single directory pass.
     
-    return _nz_audit_agent
+    Args:
+        grouped_folder: Folder containing job_* subfolders
+        
+    Returns:
+        List of JobDescriptor, one per job folder
+    """
+    with os.scandir(grouped_folder) as entries:
+        job_entries = [e for e in entries if e.name.startswith("job_") and e.is_dir()]
+    
+    jobs: List[JobDescriptor] = []
+    for entry in sorted(job_entries, key=lambda e: e.name):
+        folder = Path(entry.path)
+        pdfs: List[Path] = []
+        completed = False
+        with os.scandir(entry.path) as files:
+            for f in files:
+                if f.name == AUDIT_COMPLETE_MARKER:
+                    completed = True
+                # Match .pdf case-insensitively
+                elif f.name.lower().endswith(".pdf") and f.is_file(follow_symlinks=False):
+                    pdfs.append(Path(f.path))
+        jobs.append(JobDescriptor(
+            job_id=entry.name.removeprefix("job_"),
+            folder=folder,
+            marker=folder / AUDIT_COMPLETE_MARKER,
+            pdfs=tuple(pdfs),
+            completed=completed,
+        ))
+    return jobs
+
+
+class MarkerSink:
+    """
+    Buffer .audit_complete marker writes and flush them in batches.
+
+    Each flush first syncs the combined CSV, so a marker never reaches disk
+    before its row, then creates the batch's marker files and fsyncs each job
+    folder that received one, once. A crash can lose at most the pending
+    markers, which only means those jobs are re-audited on resume.
+    """
+    def __init__(self, csv_path: Path, batch_size: int = MARKER_FLUSH_INTERVAL):
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self._pending: List[tuple[Path, bytes]] = []
+
+    async def add(self, marker_file: Path, content: str) -> None:
+        self._pending.append((marker_file, content.encode("utf-8")))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Flush pending markers; the syncs run in a worker thread."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        # Buffered rows are written here on the loop: append_csv_row mutates the same state
+        flush_csv(self.csv_path)
+        await asyncio.to_thread(self._write_markers, pending)
+
+    def flush_sync(self) -> None:
+        """Blocking flush for interpreter exit, when no event loop is running."""
+        pending, self._pending = self._pending, []
+        if pending:
+            flush_csv(self.csv_path)
+            self._write_markers(pending)
+
+    def _write_markers(self, pending: List[tuple[Path, bytes]]) -> None:
+        _fsync_file(self.csv_path)
+        for marker_file, data in pending:
+            fd = os.open(marker_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        for folder in {marker_file.parent for marker_file, _ in pending}:
+            _fsync_dir(folder)
+
+
+def _fsync_dir(path: Path) -> None:
+    """fsync a directory so entries created in it are durable (no-op where unsupported)."""
+    try:
+        dir_fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directory fds are not supported on this platform
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 class TokenUsage:
@@ -536,7 +720,8 @@ async def run_nz_audit(
         job_id: The job ID being audited
         pdf_files: List of paths to PDF files for this job
         broker_name: Optional broker name to pre-fill
-        output_job_path: Optional path to output job folder (files will be copied here)
+        output_job_path: Optional existing output job folder (files will be copied here),
+            e.g. from create_job_directory()
         
     Returns:
         Tuple of (NZAuditResult, TokenUsage)
@@ -548,47 +733,41 @@ async def run_nz_audit(
     print(f"{'='*80}", flush=True)
     print(f"Processing {len(pdf_files)} document(s)...", flush=True)
     
-    # Copy files to output folder if specified
+    # Copy files to output folder if specified (safe_copy_file reports missing sources)
     if output_job_path:
-        output_job_path.mkdir(parents=True, exist_ok=True)
         for pdf_path in pdf_files:
-            if pdf_path.exists():
-                dest = output_job_path / pdf_path.name
-                if safe_copy_file(pdf_path, dest):
-                    print(f"  📁 Copied: {pdf_path.name} → output", flush=True)
-                else:
-                    print(f"  ⚠️  Failed to copy: {pdf_path.name}", flush=True)
+            dest = output_job_path / pdf_path.name
+            if safe_copy_file(pdf_path, dest):
+                print(f"  📁 Copied: {pdf_path.name} → output", flush=True)
+            else:
+                print(f"  ⚠️  Failed to copy: {pdf_path.name}", flush=True)
     
-    # Build message parts - start with prompt
-    prompt = f"""
-Analyze ALL the following PDF documents for Job {job_id} and:
-1. Extract the required audit metadata
-2. Perform header-level validations
-
-{f"Broker name (if not found in documents): {broker_name}" if broker_name else ""}
-
-**IMPORTANT REMINDERS**:
-- ONLY extract information that is explicitly visible in the documents
-- DO NOT make up, guess, or fabricate any information
-- If a field cannot be found, leave it empty
-- Leave date_audited as an empty string (will be filled manually)
-
-The documents are attached below. Analyze them ALL together to cross-reference information.
-"""
-    message_parts = [prompt]
+    # Build message parts - start with prompt (plain concatenation of module constants)
+    prompt = (
+        _PROMPT_HEAD + job_id + _PROMPT_INSTRUCTIONS
+        + (_PROMPT_BROKER + broker_name if broker_name else "")
+        + _PROMPT_TAIL
+    )
+    # Preallocate prompt + (header, PDF) slot pairs; trimmed after missing files are skipped
+    message_parts: List[Any] = [None] * (1 + 2 * len(pdf_files))
+    message_parts[0] = prompt
+    part_idx = 1
     
     # Add all PDF files
     for pdf_path in pdf_files:
-        if pdf_path.exists():
+        try:
             pdf_bytes = pdf_path.read_bytes()
-            message_parts.append(f"\n**Document: {pdf_path.name}**\n")
-            message_parts.append(BinaryContent(
-                data=pdf_bytes,
-                media_type="application/pdf"
-            ))
-            print(f"  📄 Added: {pdf_path.name} ({len(pdf_bytes):,} bytes)", flush=True)
-        else:
+        except FileNotFoundError:
             print(f"  ⚠️  File not found: {pdf_path}", flush=True)
+            continue
+        message_parts[part_idx] = f"\n**Document: {pdf_path.name}**\n"
+        message_parts[part_idx + 1] = BinaryContent(
+            data=pdf_bytes,
+            media_type="application/pdf"
+        )
+        part_idx += 2
+        print(f"  📄 Added: {pdf_path.name} ({len(pdf_bytes):,} bytes)", flush=True)
+    del message_parts[part_idx:]
     
     # Run the audit
     try:
@@ -610,21 +789,14 @@ The documents are attached below. Analyze them ALL together to cross-reference i
         print(f"   HAWB: {audit_output.audit_result.extraction.hawb}", flush=True)
         print(f"   📊 Tokens: input={token_usage.input_tokens:,}, output={token_usage.output_tokens:,}, total={token_usage.total_tokens:,}", flush=True)
         
-        # Log validation results with reasoning
-        hv = audit_output.audit_result.header_validation
-        print(f"\n   Header Validations:", flush=True)
-        print(f"   - Client code/name: {hv.client_code_name_correct} ({hv.client_code_name_reasoning[:60] if hv.client_code_name_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Supplier/Cnee: {hv.supplier_or_cnee_correct} ({hv.supplier_or_cnee_reasoning[:60] if hv.supplier_or_cnee_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Invoice Number: {hv.invoice_number_correct} ({hv.invoice_number_reasoning[:60] if hv.invoice_number_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - VFD: {hv.vfd_correct} ({hv.vfd_reasoning[:60] if hv.vfd_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Currency: {hv.currency_correct} ({hv.currency_reasoning[:60] if hv.currency_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Incoterm: {hv.incoterm_correct} ({hv.incoterm_reasoning[:60] if hv.incoterm_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Freight Zero: {hv.freight_zero_if_inclusive_incoterm} ({hv.freight_zero_reasoning[:60] if hv.freight_zero_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Freight Correct: {hv.freight_correct} ({hv.freight_correct_reasoning[:60] if hv.freight_correct_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Relationship: {hv.relationship_indicator_correct} ({hv.relationship_indicator_reasoning[:60] if hv.relationship_indicator_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Country of Export: {hv.country_of_export_correct} ({hv.country_of_export_reasoning[:60] if hv.country_of_export_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - Weight Correct: {hv.correct_weight_of_goods} ({hv.correct_weight_reasoning[:60] if hv.correct_weight_reasoning else 'No reasoning'})", flush=True)
-        print(f"   - CGO Correct: {hv.cgo_correct} ({hv.cgo_reasoning[:60] if hv.cgo_reasoning else 'No reasoning'})", flush=True)
+        # Log validation results with reasoning (single write, verbose mode only)
+        if _VERBOSE:
+            hv = audit_output.audit_result.header_validation
+            lines = [
+                f"   - {label}: {getattr(hv, status_field)} ({(getattr(hv, reasoning_field) or 'No reasoning')[:60]})"
+                for label, status_field, reasoning_field in _HV_LOG_FIELDS
+            ]
+            print("\n   Header Validations:\n" + "\n".join(lines), flush=True)
         
         if audit_output.audit_result.auditor_comments:
             print(f"\n   💬 Comments: {audit_output.audit_result.auditor_comments}", flush=True)
@@ -647,7 +819,9 @@ def create_csv_row(audit_result: NZAuditResult) -> Dict[str, str]:
     ext = audit_result.extraction
     hv = audit_result.header_validation
     
-    # Count errors (No results)
+    # Count errors (No results) - status values are interned, so compare by identity.
+    # This relies on every status passing intern_status; instances built with
+    # model_construct() or model_copy(update=...) skip validation and miscount.
     validation_fields = [
         hv.client_code_name_correct,
         hv.supplier_or_cnee_correct,
@@ -663,9 +837,9 @@ def create_csv_row(audit_result: NZAuditResult) -> Dict[str, str]:
         hv.cgo_correct,
     ]
     
-    error_count = sum(1 for v in validation_fields if v == "No")
+    error_count = sum(1 for v in validation_fields if v is _NO)
     # Total is count of non-N/A fields
-    total_count = sum(1 for v in validation_fields if v != "N/A")
+    total_count = sum(1 for v in validation_fields if v is not _NA)
     
     # Find the column indices for the validation range (J to AC)
     # Column J is the 10th column (index 9), AC is column 29 (index 28)
@@ -733,18 +907,9 @@ def create_csv_row(audit_result: NZAuditResult) -> Dict[str, str]:
     }
 
 
-def create_csv_file_with_headers(output_path: Path) -> Path:
-    """
-    Create a new CSV file with headers only.
-    
-    Args:
-        output_path: Path to output CSV file
-        
-    Returns:
-        Path to the created CSV file
-    """
-    # Create a dummy row to get fieldnames
-    dummy_result = NZAuditResult(
+def _placeholder_result() -> NZAuditResult:
+    """Build an empty NZAuditResult, used to read the CSV column names off create_csv_row()."""
+    return NZAuditResult(
         status="",
         extraction=NZAuditExtraction(
             audit_month="",
@@ -770,12 +935,199 @@ def create_csv_file_with_headers(output_path: Path) -> Path:
             cgo_correct="N/A"
         )
     )
-    dummy_row = create_csv_row(dummy_result)
-    fieldnames = list(dummy_row.keys())
+
+
+# CSV column names in output order (same keys as create_csv_row() rows), computed once
+FIELDNAMES: tuple[str, ...] = tuple(create_csv_row(_placeholder_result()))
+
+
+def _csv_header_line() -> str:
+    """Render FIELDNAMES as a CSV header line (quoted exactly as csv.writer does)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(FIELDNAMES)
+    return buffer.getvalue()
+
+
+_CSV_HEADER_LINE = _csv_header_line()
+
+# Map validation columns to their reasoning columns (reasoning becomes an XLSX cell comment)
+VALIDATION_REASONING_MAP: Dict[str, str] = {
+    "Client code/name correct?\nIE & EE": "Client code/name reasoning",
+    "IE - Supplier code/name correct?\nEE - Cnee name correct?": "Supplier/Cnee reasoning",
+    "Invoice Number Correct": "Invoice Number reasoning",
+    "VFD Correct": "VFD reasoning",
+    "Currency Correct": "Currency reasoning",
+    "Incoterm Correct": "Incoterm reasoning",
+    "If freight inclusive incoterm and no freight on invoice, is freight zero?": "Freight zero reasoning",
+    "Freight correct?\nRate card/ETS\nN/A if freight zero\nN/A for exports": "Freight correct reasoning",
+    "Load Port Air/Sea": "Load Port reasoning",
+    "Relationship Indicator Correct Yes/No?": "Relationship Indicator reasoning",
+    "Country of Export": "Country of Export reasoning",
+    "Correct weight of goods": "Weight reasoning",
+    "CGO (for Exports, where applicable)": "CGO reasoning",
+}
+
+
+def _number_to_excel_column(n: int) -> str:
+    """Convert 1-based column number to Excel column letter (1=A, 10=J, 29=AC)"""
+    result = ""
+    while n > 0:
+        n -= 1
+        result = chr(65 + (n % 26)) + result
+        n //= 26
+    return result
+
+
+# Excel column letters for columns 1..256 (EXCEL_COL_LETTERS[n - 1] is column n)
+EXCEL_COL_LETTERS: tuple[str, ...] = tuple(_number_to_excel_column(i) for i in range(1, 257))
+
+
+# Broker-sheet layout of the combined XLSX, fixed by FIELDNAMES
+# Headers exclude reasoning columns - they're only for comments
+DISPLAY_HEADERS: tuple[str, ...] = tuple(h for h in FIELDNAMES if not h.endswith("reasoning"))
+ERRORS_COL_IDX = DISPLAY_HEADERS.index("Audit Score - Errors") + 1
+TOTAL_COL_IDX = DISPLAY_HEADERS.index("Audit Score - Total") + 1
+HAWB_COL_IDX = DISPLAY_HEADERS.index("HAWB") + 1
+# Audit score formulas count over J..AC, where J is the first validation column in FIELDNAMES
+FIRST_VALIDATION_COL_LETTER = EXCEL_COL_LETTERS[FIELDNAMES.index("Client code/name correct?\nIE & EE")]
+LAST_VALIDATION_COL_LETTER = "AC"
+# Audit score formula templates, formatted with the row number
+_ERRORS_FORMULA = f'=COUNTIF(${FIRST_VALIDATION_COL_LETTER}{{0}}:${LAST_VALIDATION_COL_LETTER}{{0}},"No")'
+_TOTAL_FORMULA = f'=COUNTIF(${FIRST_VALIDATION_COL_LETTER}{{0}}:${LAST_VALIDATION_COL_LETTER}{{0}},"<>N/A")'
+# (0-based display column, reasoning column) for every commented validation column
+COMMENT_POSITIONS: tuple[tuple[int, str], ...] = tuple(
+    (col_idx, VALIDATION_REASONING_MAP[header])
+    for col_idx, header in enumerate(DISPLAY_HEADERS)
+    if header in VALIDATION_REASONING_MAP
+)
+# Pulls DISPLAY_HEADERS values out of a create_csv_row() dict in one call
+_get_display_values = operator.itemgetter(*DISPLAY_HEADERS)
+
+
+
+
+# Number of rows appended to a combined CSV between disk writes
+CSV_FLUSH_INTERVAL = 10
+
+# Write buffer of the append handle kept open on a combined CSV
+_CSV_APPEND_BUFFER_SIZE = 64 * 1024
+
+
+class _CombinedCsv:
+    """
+    In-memory copy of a combined CSV kept across append_csv_row() calls.
+
+    New rows are appended in batches through one append handle that stays
+    open until close(); replacing an existing HAWB marks the file for a full
+    rewrite at the next flush.
+    """
+    def __init__(self, fieldnames: List[str], rows: List[Dict[str, str]]):
+        self.fieldnames = fieldnames
+        self.rows = rows
+        self.hawbs = {r.get("HAWB", "") for r in rows}
+        self.unflushed: List[Dict[str, str]] = []
+        self.pending = 0
+        self.needs_rewrite = False
+        self.handle = None
+        self.writer = None
+
+    def flush(self, csv_path: Path) -> None:
+        if self.needs_rewrite:
+            self.close()
+            with open(csv_path, 'w', newline='', encoding='utf-8', buffering=_IO_BUFFER_SIZE) as f:
+                writer = csv.writer(f)
+                writer.writerow(self.fieldnames)
+                writer.writerows([r.get(h, "") for h in self.fieldnames] for r in self.rows)
+        elif self.unflushed:
+            if self.handle is None:
+                self.handle = open(csv_path, 'a', newline='', encoding='utf-8', buffering=_CSV_APPEND_BUFFER_SIZE)
+                self.writer = csv.writer(self.handle)
+            self.writer.writerows([r.get(h, "") for h in self.fieldnames] for r in self.unflushed)
+            # Push the batch to the OS so downloads mid-run see it
+            self.handle.flush()
+        self.unflushed = []
+        self.pending = 0
+        self.needs_rewrite = False
+
+    def close(self) -> None:
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+            self.writer = None
+
+
+# Combined CSV files being appended to, keyed by path (populated lazily per file)
+_combined_csvs: Dict[Path, _CombinedCsv] = {}
+
+
+def _load_combined_csv(csv_path: Path) -> _CombinedCsv:
+    """Parse an existing combined CSV once into its in-memory form."""
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = [dict(row) for row in reader]
+        fieldnames = list(reader.fieldnames or [])
+    return _CombinedCsv(fieldnames, rows)
+
+
+def finalize_csv(output_path: Path) -> None:
+    """Write any buffered rows of a combined CSV and release it from memory."""
+    state = _combined_csvs.pop(output_path, None)
+    if state is not None:
+        try:
+            state.flush(output_path)
+        finally:
+            state.close()
+
+
+def flush_csv(output_path: Path) -> None:
+    """Write any buffered rows of a combined CSV, keeping it open for appends."""
+    state = _combined_csvs.get(output_path)
+    if state is not None:
+        state.flush(output_path)
+
+
+def _fsync_file(path: Path) -> None:
+    """fsync a file that may not exist yet (no-op if it doesn't)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _flush_combined_csvs() -> None:
+    """Interpreter-exit hook: write rows buffered since the last flush."""
+    for output_path, state in list(_combined_csvs.items()):
+        try:
+            state.flush(output_path)
+            state.close()
+        except Exception as e:
+            print(f"⚠️  Failed to flush {output_path} on exit: {e}", flush=True)
+    _combined_csvs.clear()
+
+
+atexit.register(_flush_combined_csvs)
+
+
+def create_csv_file_with_headers(output_path: Path) -> Path:
+    """
+    Create a new CSV file with headers only.
     
+    Args:
+        output_path: Path to output CSV file
+        
+    Returns:
+        Path to the created CSV file
+    """
+    previous = _combined_csvs.pop(output_path, None)
+    if previous is not None:
+        previous.close()
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        f.write(_CSV_HEADER_LINE)
+    _combined_csvs[output_path] = _CombinedCsv(list(FIELDNAMES), [])
     
     print(f"📝 Created CSV file with headers: {output_path}", flush=True)
     return output_path
@@ -787,29 +1139,35 @@ def append_csv_row(row: Dict[str, str], output_path: Path) -> None:
     If a row with the same HAWB exists, it will be replaced (updated).
     Otherwise, the row will be appended.
     
+    The file is parsed once and kept in memory. Rows reach disk every
+    CSV_FLUSH_INTERVAL calls and on finalize_csv(); new HAWBs are appended,
+    and the file is only rewritten after a HAWB was replaced.
+    
     Args:
         row: Row dictionary from create_csv_row()
         output_path: Path to existing CSV file
     """
-    if not output_path.exists():
-        raise FileNotFoundError(f"CSV file does not exist: {output_path}")
-    
-    # Load existing rows
-    existing_rows = _load_existing_csv_results(output_path)
+    state = _combined_csvs.get(output_path)
+    if state is None:
+        if not output_path.exists():
+            raise FileNotFoundError(f"CSV file does not exist: {output_path}")
+        state = _combined_csvs[output_path] = _load_combined_csv(output_path)
     
-    # Check if row with same HAWB exists
     hawb = row.get("HAWB", "")
-    existing_rows = [r for r in existing_rows if r.get("HAWB") != hawb]
-    
-    # Add the new/updated row
-    existing_rows.append(row)
+    if hawb in state.hawbs or not state.fieldnames:
+        # Replace the existing row(s) for this HAWB; header follows the new row
+        state.rows = [r for r in state.rows if r.get("HAWB") != hawb]
+        state.rows.append(row)
+        state.fieldnames = list(row.keys())
+        state.needs_rewrite = True
+    else:
+        state.rows.append(row)
+        state.unflushed.append(row)
+    state.hawbs.add(hawb)
     
-    # Rewrite the entire file
-    fieldnames = list(row.keys())
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(existing_rows)
+    state.pending += 1
+    if state.pending >= CSV_FLUSH_INTERVAL:
+        state.flush(output_path)
 
 
 def write_audit_csv(
@@ -832,15 +1190,16 @@ def write_audit_csv(
     # Get column headers from first result
     fieldnames = list(results[0].keys())
     
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+    with open(output_path, 'w', newline='', encoding='utf-8', buffering=_IO_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows([r.get(h, "") for h in fieldnames] for r in results)
     
     print(f"\n📝 CSV written: {output_path}", flush=True)
     return output_path
 
 
+@functools.lru_cache(maxsize=1024)
 def normalize_broker_name(broker_name: str) -> str:
     """
     Normalize broker name by:
@@ -848,6 +1207,8 @@ def normalize_broker_name(broker_name: str) -> str:
     - Converting to title case (first letter uppercase, rest lowercase)
     - Collapsing multiple spaces to single space
     
+    Results are memoized - a run only sees a handful of distinct brokers.
+    
     Args:
         broker_name: Raw broker name from CSV
         
@@ -858,26 +1219,120 @@ def normalize_broker_name(broker_name: str) -> str:
         return "Unknown"
     
     # Strip whitespace and collapse multiple spaces
-    normalized = re.sub(r'\s+', ' ', broker_name.strip())
+    normalized = _WS_RE.sub(' ', broker_name.strip())
     # Convert to title case (e.g., "AZHAR ALI" -> "Azhar Ali")
     normalized = normalized.title()
     
     return normalized
 
 
+def _save_workbook(wb: Any, output_path: Path, compression: int = zipfile.ZIP_DEFLATED) -> None:
+    """
+    Save an openpyxl workbook through a large buffered file handle.
+    
+    Same as wb.save(), but lets intermediate saves skip compression (ZIP_STORED).
+    """
+    from openpyxl.writer.excel import ExcelWriter
+    
+    with open(output_path, 'wb', buffering=_IO_BUFFER_SIZE) as f:
+        archive = zipfile.ZipFile(f, 'w', compression, allowZip64=True)
+        ExcelWriter(wb, archive).save()
+
+
 # Lock for XLSX file updates (to prevent concurrent write issues)
 _xlsx_update_lock = asyncio.Lock()
 
+# Single worker thread for blocking openpyxl load/save work (serializes XLSX file writes)
+XLSX_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nz-xlsx")
 
-def create_xlsx_file_with_headers(output_path: Path) -> Path:
+# Number of completed jobs buffered before their rows are flushed to the combined XLSX
+XLSX_FLUSH_INTERVAL = 50
+
+
+class _OpenWorkbook:
+    """A combined XLSX kept loaded in memory across flush_xlsx_rows() calls."""
+    def __init__(self, wb: Any):
+        self.wb = wb
+        # True once an uncompressed intermediate save has been written
+        self.saved_uncompressed = False
+        # Sheet name (broker sheets and "Summary") -> {HAWB: row index}, built on first access per sheet
+        self.hawb_rows: Dict[str, Dict[Any, int]] = {}
+        # Sheet name -> next free row index, so appends never rescan max_row
+        self.next_rows: Dict[str, int] = {}
+
+
+# Combined XLSX files currently held open, keyed by path (guarded by _xlsx_update_lock)
+_open_workbooks: Dict[Path, _OpenWorkbook] = {}
+
+
+def _finalize_xlsx_sync(
+    output_path: Path,
+    rows: List[Dict[str, str]] | None,
+    unflushed: List[Dict[str, str]] | None,
+) -> None:
+    """Blocking part of finalize_xlsx(); runs on XLSX_EXECUTOR."""
+    entry = _open_workbooks.pop(output_path, None)
+    if rows:
+        try:
+            write_audit_xlsx(rows, output_path)
+            return
+        except Exception as e:
+            print(f"   ⚠️  Streaming rebuild of {output_path.name} failed, saving open workbook: {e}", flush=True)
+    if unflushed:
+        # No rebuild, so rows that never reached the workbook are added now
+        if entry is None:
+            entry = _load_open_workbook(output_path)
+        for row in unflushed:
+            _write_xlsx_row(entry, row)
+    if entry is not None and (entry.saved_uncompressed or unflushed):
+        # Final save is compressed
+        _save_workbook(entry.wb, output_path)
+
+
+async def finalize_xlsx(
+    output_path: Path,
+    rows: List[Dict[str, str]] | None = None,
+    unflushed: List[Dict[str, str]] | None = None,
+) -> None:
     """
-    Create a new XLSX file with headers only (empty workbook ready for incremental updates).
+    Write the final combined XLSX and release its in-memory workbook.
+    
+    When the batch's rows are given, the file is rebuilt from them with the
+    streaming (write-only) writer instead of serialising the loaded workbook.
+    Otherwise the open workbook is re-saved compressed, with any rows not yet
+    passed to flush_xlsx_rows() added first.
     
     Args:
-        output_path: Path to output XLSX file
-        
-    Returns:
-        Path to the created XLSX file
+        output_path: Path to the combined XLSX file
+        rows: All combined rows (e.g. read back from the combined CSV), if available
+        unflushed: Rows buffered since the last flush_xlsx_rows() call
+    """
+    async with _xlsx_update_lock:
+        await asyncio.get_running_loop().run_in_executor(
+            XLSX_EXECUTOR, _finalize_xlsx_sync, output_path, rows, unflushed
+        )
+
+
+def _save_open_workbooks() -> None:
+    """Interpreter-exit hook: compress combined XLSX files that were never finalized."""
+    for output_path, entry in list(_open_workbooks.items()):
+        if entry.saved_uncompressed:
+            try:
+                _save_workbook(entry.wb, output_path)
+            except Exception as e:
+                print(f"⚠️  Failed to save {output_path} on exit: {e}", flush=True)
+    _open_workbooks.clear()
+
+
+atexit.register(_save_open_workbooks)
+
+
+@functools.cache
+def _xlsx_template_bytes() -> bytes:
+    """
+    Build the empty combined XLSX (styled Summary sheet headers) once per process.
+    
+    The workbook is always identical, so later runs just write these bytes out.
     """
     try:
         from openpyxl import Workbook
@@ -885,34 +1340,6 @@ def create_xlsx_file_with_headers(output_path: Path) -> Path:
     except ImportError:
         raise ImportError("openpyxl is required for XLSX export. Install with: pip install openpyxl")
     
-    # Create a dummy row to get fieldnames
-    dummy_result = NZAuditResult(
-        status="",
-        extraction=NZAuditExtraction(
-            audit_month="",
-            broker="",
-            dhl_job_number="",
-            hawb="",
-            import_export="",
-            entry_number="",
-            entry_date=""
-        ),
-        header_validation=NZAuditHeaderValidation(
-            client_code_name_correct="N/A",
-            supplier_or_cnee_correct="N/A",
-            invoice_number_correct="N/A",
-            vfd_correct="N/A",
-            currency_correct="N/A",
-            incoterm_correct="N/A",
-            freight_zero_if_inclusive_incoterm="N/A",
-            freight_correct="N/A",
-            relationship_indicator_correct="N/A",
-            country_of_export_correct="N/A",
-            correct_weight_of_goods="N/A",
-            cgo_correct="N/A"
-        )
-    )
-    dummy_row = create_csv_row(dummy_result)
     
     # Create workbook with summary sheet
     wb = Workbook()
@@ -935,199 +1362,234 @@ def create_xlsx_file_with_headers(output_path: Path) -> Path:
     summary_sheet.column_dimensions['B'].width = 15
     summary_sheet.column_dimensions['C'].width = 25
     
-    wb.save(output_path)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def create_xlsx_file_with_headers(output_path: Path) -> Path:
+    """
+    Create a new XLSX file with headers only (empty workbook ready for incremental updates).
+    
+    Args:
+        output_path: Path to output XLSX file
+        
+    Returns:
+        Path to the created XLSX file
+    """
+    output_path.write_bytes(_xlsx_template_bytes())
+    _open_workbooks.pop(output_path, None)
     print(f"📊 Created XLSX file with headers: {output_path}", flush=True)
     return output_path
 
 
-async def append_xlsx_row(row: Dict[str, str], output_path: Path) -> None:
+def _write_xlsx_row(entry: _OpenWorkbook, row: Dict[str, str]) -> None:
     """
-    Append a single row to an existing XLSX file.
-    This function loads the existing file, adds the row, and saves it.
-    Uses a lock to prevent concurrent write issues.
+    Write one row into an open combined workbook's broker and Summary sheets.
+    If a row with the same HAWB exists it is updated in place, otherwise appended.
     
     Args:
+        entry: Open workbook from _open_workbooks
         row: Row dictionary from create_csv_row()
-        output_path: Path to existing XLSX file
     """
-    async with _xlsx_update_lock:
-        try:
-            from openpyxl import load_workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from openpyxl.comments import Comment
-        except ImportError:
-            raise ImportError("openpyxl is required for XLSX export. Install with: pip install openpyxl")
-        
-        if not output_path.exists():
-            raise FileNotFoundError(f"XLSX file does not exist: {output_path}")
-        
-        # Load existing workbook
-        wb = load_workbook(output_path)
-        
-        # Get fieldnames from the row
-        fieldnames = list(row.keys())
-        
-        # Map validation columns to their reasoning columns
-        validation_reasoning_map = {
-            "Client code/name correct?\nIE & EE": "Client code/name reasoning",
-            "IE - Supplier code/name correct?\nEE - Cnee name correct?": "Supplier/Cnee reasoning",
-            "Invoice Number Correct": "Invoice Number reasoning",
-            "VFD Correct": "VFD reasoning",
-            "Currency Correct": "Currency reasoning",
-            "Incoterm Correct": "Incoterm reasoning",
-            "If freight inclusive incoterm and no freight on invoice, is freight zero?": "Freight zero reasoning",
-            "Freight correct?\nRate card/ETS\nN/A if freight zero\nN/A for exports": "Freight correct reasoning",
-            "Load Port Air/Sea": "Load Port reasoning",
-            "Relationship Indicator Correct Yes/No?": "Relationship Indicator reasoning",
-            "Country of Export": "Country of Export reasoning",
-            "Correct weight of goods": "Weight reasoning",
-            "CGO (for Exports, where applicable)": "CGO reasoning",
-        }
-        
-        # Get broker name and normalize it
-        broker_raw = row.get("Broker", "").strip()
-        broker_normalized = normalize_broker_name(broker_raw)
-        
-        # Find or create broker sheet
-        sheet_name = broker_normalized[:31]
-        sheet_name = re.sub(r'[\\/?*\[\]:]', '_', sheet_name)
-        
-        if sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-        else:
-            sheet = wb.create_sheet(sheet_name)
-            # Write headers
-            display_headers = [h for h in fieldnames if not h.endswith("reasoning")]
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF")
-            
-            for col_idx, header in enumerate(display_headers, start=1):
-                cell = sheet.cell(row=1, column=col_idx, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            
-            # Set column widths
-            for col_idx, header in enumerate(display_headers, start=1):
-                col_letter = sheet.cell(row=1, column=col_idx).column_letter
-                if "Date" in header:
-                    sheet.column_dimensions[col_letter].width = 12
-                elif "Comments" in header:
-                    sheet.column_dimensions[col_letter].width = 50
-                elif len(header) > 20:
-                    sheet.column_dimensions[col_letter].width = 25
-                else:
-                    sheet.column_dimensions[col_letter].width = max(len(header) + 2, 12)
-        
-        # Find next row
-        next_row = sheet.max_row + 1
-        
-        # Find column indices for formulas
-        display_headers = [h for h in fieldnames if not h.endswith("reasoning")]
-        errors_col_idx = None
-        total_col_idx = None
-        hawb_col_idx = None
-        
-        for col_idx, header in enumerate(display_headers, start=1):
-            if header == "Audit Score - Errors":
-                errors_col_idx = col_idx
-            elif header == "Audit Score - Total":
-                total_col_idx = col_idx
-            elif header == "HAWB":
-                hawb_col_idx = col_idx
-        
-        # Find Excel column letters for validation range
-        first_validation_excel_col = None
-        col_count = 0
-        for header in fieldnames:
-            col_count += 1
-            if header == "Client code/name correct?\nIE & EE":
-                first_validation_excel_col = col_count
-                break
-        
-        def number_to_excel_column(n):
-            result = ""
-            while n > 0:
-                n -= 1
-                result = chr(65 + (n % 26)) + result
-                n //= 26
-            return result
-        
-        first_col_letter = number_to_excel_column(first_validation_excel_col) if first_validation_excel_col else "J"
-        last_col_letter = "AC"
-        
-        # Check if row with same HAWB already exists in the sheet (BEFORE writing)
-        hawb = row.get("HAWB", "")
-        existing_row_idx = None
-        if hawb_col_idx:
-            for row_idx in range(2, sheet.max_row + 1):
-                if sheet.cell(row=row_idx, column=hawb_col_idx).value == hawb:
-                    existing_row_idx = row_idx
-                    break
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.comments import Comment
+    
+    wb = entry.wb
+    
+    # Get broker name and normalize it
+    broker_raw = row.get("Broker", "").strip()
+    broker_normalized = normalize_broker_name(broker_raw)
+    
+    # Find or create broker sheet
+    sheet_name = broker_normalized[:31]
+    sheet_name = _SHEET_INVALID_RE.sub('_', sheet_name)
+    
+    if sheet_name in wb.sheetnames:
+        sheet = wb[sheet_name]
+    else:
+        sheet = wb.create_sheet(sheet_name)
+        # Write headers
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF")
         
-        if existing_row_idx:
-            # Update existing row instead of appending
-            next_row = existing_row_idx
-            # Clear existing row first (values and comments)
-            for col_idx in range(1, len(display_headers) + 1):
-                cell = sheet.cell(row=next_row, column=col_idx)
-                cell.value = None
-                cell.comment = None
-        else:
-            # Append new row
-            next_row = sheet.max_row + 1
+        for col_idx, header in enumerate(DISPLAY_HEADERS, start=1):
+            cell = sheet.cell(row=1, column=col_idx, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
         
-        # Write row data (either updating existing or appending new)
-        for col_idx, header in enumerate(display_headers, start=1):
-            value = row.get(header, "")
-            
-            # Set formulas for audit scores
-            if col_idx == errors_col_idx:
-                formula = f'=COUNTIF(${first_col_letter}{next_row}:${last_col_letter}{next_row},"No")'
-                cell = sheet.cell(row=next_row, column=col_idx, value=formula)
-            elif col_idx == total_col_idx:
-                formula = f'=COUNTIF(${first_col_letter}{next_row}:${last_col_letter}{next_row},"<>N/A")'
-                cell = sheet.cell(row=next_row, column=col_idx, value=formula)
+        # Set column widths
+        for col_idx, header in enumerate(DISPLAY_HEADERS, start=1):
+            col_letter = EXCEL_COL_LETTERS[col_idx - 1]
+            if "Date" in header:
+                sheet.column_dimensions[col_letter].width = 12
+            elif "Comments" in header:
+                sheet.column_dimensions[col_letter].width = 50
+            elif len(header) > 20:
+                sheet.column_dimensions[col_letter].width = 25
             else:
-                cell = sheet.cell(row=next_row, column=col_idx, value=value)
+                sheet.column_dimensions[col_letter].width = max(len(header) + 2, 12)
+        entry.next_rows[sheet_name] = 2
+    
+    # Check if row with same HAWB already exists in the sheet (BEFORE writing)
+    hawb = row.get("HAWB", "")
+    hawb_rows = entry.hawb_rows.get(sheet_name)
+    if hawb_rows is None:
+        # Index the sheet's HAWB column once; later lookups are O(1)
+        hawb_rows = entry.hawb_rows[sheet_name] = {}
+        hawb_column = sheet.iter_rows(min_row=2, min_col=HAWB_COL_IDX, max_col=HAWB_COL_IDX, values_only=True)
+        for row_idx, (value,) in enumerate(hawb_column, start=2):
+            hawb_rows.setdefault(value, row_idx)
+    existing_row_idx = hawb_rows.get(hawb)
+    
+    if existing_row_idx:
+        # Update existing row instead of appending
+        next_row = existing_row_idx
+    else:
+        # Append new row
+        next_row = entry.next_rows.get(sheet_name) or sheet.max_row + 1
+        entry.next_rows[sheet_name] = next_row + 1
+        hawb_rows[hawb] = next_row
+    
+    # Cell values for the row, with formulas for audit scores
+    try:
+        row_values = list(_get_display_values(row))
+    except KeyError:
+        row_values = [row.get(header, "") for header in DISPLAY_HEADERS]
+    row_values[ERRORS_COL_IDX - 1] = _ERRORS_FORMULA.format(next_row)
+    row_values[TOTAL_COL_IDX - 1] = _TOTAL_FORMULA.format(next_row)
+    
+    if not existing_row_idx:
+        sheet.append(row_values)
+    
+    # Style the row's cells (and overwrite values and comments when updating)
+    data_alignment = Alignment(wrap_text=True, vertical="top")
+    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    row_cells = next(sheet.iter_rows(min_row=next_row, max_row=next_row, max_col=len(DISPLAY_HEADERS)))
+    for cell, cell_value in zip(row_cells, row_values):
+        if existing_row_idx:
+            cell.value = cell_value
+            cell.comment = None
+
+        cell.alignment = data_alignment
+
+        # Yellow background for "No" values
+        if cell_value == "No":
+            cell.fill = yellow_fill
+
+    # Add comments with reasoning to the validation columns only
+    for col_idx, reasoning_header in COMMENT_POSITIONS:
+        reasoning = row.get(reasoning_header)
+        if reasoning and (reasoning := reasoning.strip()):
+            row_cells[col_idx].comment = Comment(reasoning, "Audit System")
+    
+    # Update summary sheet - check if HAWB exists first
+    summary_sheet = wb["Summary"]
+    summary_hawb_rows = entry.hawb_rows.get("Summary")
+    if summary_hawb_rows is None:
+        # Index the Summary sheet's HAWB column (column B) once, like the broker sheets
+        summary_hawb_rows = entry.hawb_rows["Summary"] = {}
+        hawb_column = summary_sheet.iter_rows(min_row=2, min_col=2, max_col=2, values_only=True)
+        for row_idx, (value,) in enumerate(hawb_column, start=2):
+            summary_hawb_rows.setdefault(value, row_idx)
+    summary_existing_row_idx = summary_hawb_rows.get(hawb)
+    
+    if summary_existing_row_idx:
+        # Update existing summary row
+        summary_sheet.cell(row=summary_existing_row_idx, column=1, value=row.get("DHL Job Nmb", ""))
+        summary_sheet.cell(row=summary_existing_row_idx, column=2, value=hawb)
+        summary_sheet.cell(row=summary_existing_row_idx, column=3, value=broker_normalized)
+    else:
+        # Append new summary row
+        summary_next_row = entry.next_rows.get("Summary") or summary_sheet.max_row + 1
+        entry.next_rows["Summary"] = summary_next_row + 1
+        summary_hawb_rows[hawb] = summary_next_row
+        summary_sheet.append([row.get("DHL Job Nmb", ""), hawb, broker_normalized])
 
-            cell.alignment = Alignment(wrap_text=True, vertical="top")
 
-            # Yellow background for "No" values
-            if value == "No":
-                yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-                cell.fill = yellow_fill
+def _load_open_workbook(output_path: Path) -> _OpenWorkbook:
+    """Load an existing combined XLSX for in-place row updates."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("openpyxl is required for XLSX export. Install with: pip install openpyxl")
+    
+    if not output_path.exists():
+        raise FileNotFoundError(f"XLSX file does not exist: {output_path}")
+    # Skip VBA, external links and rich text - the audit workbook never has them.
+    # openpyxl uses lxml for parsing/serialising when it is installed.
+    wb = load_workbook(output_path, keep_vba=False, keep_links=False, rich_text=False)
+    return _OpenWorkbook(wb)
 
-            # Add comment with reasoning if this is a validation column
-            if header in validation_reasoning_map:
-                reasoning_header = validation_reasoning_map[header]
-                reasoning = row.get(reasoning_header, "").strip()
-                if reasoning:
-                    comment = Comment(reasoning, "Audit System")
-                    cell.comment = comment
+
+def _flush_xlsx_rows_sync(rows: List[Dict[str, str]], output_path: Path) -> None:
+    """Blocking part of flush_xlsx_rows(); runs on XLSX_EXECUTOR."""
+    # Reuse the in-memory workbook, loading it on first use
+    entry = _open_workbooks.get(output_path)
+    if entry is None:
+        entry = _open_workbooks[output_path] = _load_open_workbook(output_path)
+    
+    for row in rows:
+        _write_xlsx_row(entry, row)
+    
+    # Intermediate saves skip compression; finalize_xlsx() writes the compact file
+    _save_workbook(entry.wb, output_path, compression=zipfile.ZIP_STORED)
+    entry.saved_uncompressed = True
+
+
+async def flush_xlsx_rows(rows: List[Dict[str, str]], output_path: Path) -> None:
+    """
+    Write a batch of rows to an existing XLSX file and save it once.
+    The workbook is loaded on first use and kept in memory across flushes;
+    finalize_xlsx() writes the final compressed file and releases it.
+    The openpyxl work runs on XLSX_EXECUTOR so the event loop keeps serving
+    other jobs; the lock prevents concurrent write issues.
+    
+    Args:
+        rows: Row dictionaries from create_csv_row()
+        output_path: Path to existing XLSX file
+    """
+    if not rows:
+        return
+    
+    async with _xlsx_update_lock:
+        await asyncio.get_running_loop().run_in_executor(XLSX_EXECUTOR, _flush_xlsx_rows_sync, rows, output_path)
+
+
+def _build_broker_cells(broker_rows: List[Dict[str, str]]) -> List[List[tuple]]:
+    """
+    Build the data-row cell payloads for one broker sheet of write_audit_xlsx():
+    one (value, is_no, reasoning) tuple per DISPLAY_HEADERS column.
+    
+    Uses the same module-level layout constants as _write_xlsx_row().
+    
+    Args:
+        broker_rows: Rows for this broker, from create_csv_row()
         
-        # Update summary sheet - check if HAWB exists first
-        summary_sheet = wb["Summary"]
-        summary_existing_row_idx = None
-        for row_idx in range(2, summary_sheet.max_row + 1):
-            if summary_sheet.cell(row=row_idx, column=2).value == hawb:
-                summary_existing_row_idx = row_idx
-                break
+    Returns:
+        List of rows, each a list of cell tuples
+    """
+    rows = []
+    for row_idx, row_data in enumerate(broker_rows, start=2):
+        # One C-level extraction per row; fall back to .get() for rows missing columns
+        try:
+            values = _get_display_values(row_data)
+        except KeyError:
+            values = [row_data.get(header, "") for header in DISPLAY_HEADERS]
+        row_cells = [(value, value == "No", "") for value in values]
         
-        if summary_existing_row_idx:
-            # Update existing summary row
-            summary_sheet.cell(row=summary_existing_row_idx, column=1, value=row.get("DHL Job Nmb", ""))
-            summary_sheet.cell(row=summary_existing_row_idx, column=2, value=hawb)
-            summary_sheet.cell(row=summary_existing_row_idx, column=3, value=broker_normalized)
-        else:
-            # Append new summary row
-            summary_next_row = summary_sheet.max_row + 1
-            summary_sheet.cell(row=summary_next_row, column=1, value=row.get("DHL Job Nmb", ""))
-            summary_sheet.cell(row=summary_next_row, column=2, value=hawb)
-            summary_sheet.cell(row=summary_next_row, column=3, value=broker_normalized)
+        # Formulas for audit scores
+        row_cells[ERRORS_COL_IDX - 1] = (_ERRORS_FORMULA.format(row_idx), False, "")
+        row_cells[TOTAL_COL_IDX - 1] = (_TOTAL_FORMULA.format(row_idx), False, "")
         
-        # Save workbook
-        wb.save(output_path)
+        for col_idx, reasoning_header in COMMENT_POSITIONS:
+            reasoning = row_data.get(reasoning_header)
+            if reasoning and (reasoning := reasoning.strip()):
+                cell_value, is_no, _ = row_cells[col_idx]
+                row_cells[col_idx] = (cell_value, is_no, reasoning)
+        rows.append(row_cells)
+    return rows
 
 
 def write_audit_xlsx(
@@ -1140,6 +1602,9 @@ def write_audit_xlsx(
     - One summary sheet listing all jobs (DHL Job Nmb, HAWB, Broker)
     - Excel cell comments with reasoning for each validation
     
+    All rows are known up front, so the workbook is written in openpyxl's
+    write-only (streaming) mode instead of keeping every cell in memory.
+    
     Args:
         results: List of row dictionaries from create_csv_row()
         output_path: Path to output XLSX file
@@ -1149,6 +1614,7 @@ def write_audit_xlsx(
     """
     try:
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment
         from openpyxl.comments import Comment
     except ImportError:
@@ -1157,34 +1623,14 @@ def write_audit_xlsx(
     if not results:
         raise ValueError("No results to write")
     
-    # Get column headers from first result
-    fieldnames = list(results[0].keys())
-    
-    # Map validation columns to their reasoning columns
-    validation_reasoning_map = {
-        "Client code/name correct?\nIE & EE": "Client code/name reasoning",
-        "IE - Supplier code/name correct?\nEE - Cnee name correct?": "Supplier/Cnee reasoning",
-        "Invoice Number Correct": "Invoice Number reasoning",
-        "VFD Correct": "VFD reasoning",
-        "Currency Correct": "Currency reasoning",
-        "Incoterm Correct": "Incoterm reasoning",
-        "If freight inclusive incoterm and no freight on invoice, is freight zero?": "Freight zero reasoning",
-        "Freight correct?\nRate card/ETS\nN/A if freight zero\nN/A for exports": "Freight correct reasoning",
-        "Load Port Air/Sea": "Load Port reasoning",
-        "Relationship Indicator Correct Yes/No?": "Relationship Indicator reasoning",
-        "Country of Export": "Country of Export reasoning",
-        "Correct weight of goods": "Weight reasoning",
-        "CGO (for Exports, where applicable)": "CGO reasoning",
-    }
-    
-    # Group results by normalized broker name
-    broker_groups: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+    # Pair each row with its normalized broker name
+    keyed_rows: List[tuple[str, Dict[str, str]]] = []
     summary_rows: List[Dict[str, str]] = []
     
     for row in results:
         broker_raw = row.get("Broker", "").strip()
         broker_normalized = normalize_broker_name(broker_raw)
-        broker_groups[broker_normalized].append(row)
+        keyed_rows.append((broker_normalized, row))
         
         # Add to summary
         summary_rows.append({
@@ -1193,136 +1639,60 @@ def write_audit_xlsx(
             "Broker": broker_normalized
         })
     
-    # Create workbook
-    wb = Workbook()
+    # Group by broker with one stable sort (rows keep their order within a broker)
+    broker_key = operator.itemgetter(0)
+    keyed_rows.sort(key=broker_key)
+    broker_groups: Dict[str, List[Dict[str, str]]] = {
+        broker_name: [row for _, row in group]
+        for broker_name, group in itertools.groupby(keyed_rows, key=broker_key)
+    }
     
-    # Remove default sheet
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
+    # Create streaming workbook (write-only workbooks start with no sheets)
+    wb = Workbook(write_only=True)
     
     # Create summary sheet
-    summary_sheet = wb.create_sheet("Summary", index=0)
+    summary_sheet = wb.create_sheet("Summary")
     summary_headers = ["DHL Job Nmb", "HAWB", "Broker"]
     
-    # Style summary headers
+    # Shared styles
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
+    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    data_alignment = Alignment(wrap_text=True, vertical="top")
     
-    for col_idx, header in enumerate(summary_headers, start=1):
-        cell = summary_sheet.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Write summary data
-    for row_idx, summary_row in enumerate(summary_rows, start=2):
-        for col_idx, header in enumerate(summary_headers, start=1):
-            summary_sheet.cell(row=row_idx, column=col_idx, value=summary_row.get(header, ""))
+    def header_row(sheet, headers, alignment):
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = alignment
+            cells.append(cell)
+        return cells
     
-    # Auto-adjust column widths for summary
+    # Column widths must be set before the first row is streamed
     summary_sheet.column_dimensions['A'].width = 15
     summary_sheet.column_dimensions['B'].width = 15
     summary_sheet.column_dimensions['C'].width = 25
     
+    summary_sheet.append(header_row(summary_sheet, summary_headers, Alignment(horizontal="center", vertical="center")))
+    
+    # Write summary data
+    for summary_row in summary_rows:
+        summary_sheet.append([summary_row.get(header, "") for header in summary_headers])
+    
     # Create one sheet per broker
-    for broker_name in sorted(broker_groups.keys()):
+    for broker_name, broker_rows in broker_groups.items():
         # Sanitize sheet name (Excel has restrictions: max 31 chars, no special chars)
         sheet_name = broker_name[:31]
         # Replace invalid characters
-        sheet_name = re.sub(r'[\\/?*\[\]:]', '_', sheet_name)
+        sheet_name = _SHEET_INVALID_RE.sub('_', sheet_name)
         
         sheet = wb.create_sheet(sheet_name)
-        broker_rows = broker_groups[broker_name]
-        
-        # Write headers (excluding reasoning columns - they're only for comments)
-        display_headers = [h for h in fieldnames if not h.endswith("reasoning")]
-        for col_idx, header in enumerate(display_headers, start=1):
-            cell = sheet.cell(row=1, column=col_idx, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        # Find column indices for formulas
-        # We need to find the Excel column letters for J (first validation) and AC (last validation)
-        # Column J = 10, Column AC = 29 in Excel
-        # But we need to account for all columns including reasoning columns to get the correct Excel column letters
-        
-        errors_col_idx = None
-        total_col_idx = None
-        
-        # Find indices in display_headers (without reasoning columns)
-        for col_idx, header in enumerate(display_headers, start=1):
-            if header == "Audit Score - Errors":
-                errors_col_idx = col_idx
-            elif header == "Audit Score - Total":
-                total_col_idx = col_idx
-        
-        # Find the Excel column letters for the validation range
-        # Column J (10) is the first validation column: "Client code/name correct?\nIE & EE"
-        # Column AC (29) is the last validation column (hardcoded as per user requirement)
-        # We need to find column J position, but AC is fixed
-        
-        first_validation_excel_col = None  # Column J (10)
-        
-        col_count = 0
-        for header in fieldnames:
-            col_count += 1
-            if header == "Client code/name correct?\nIE & EE":
-                # This is column J (10th column)
-                first_validation_excel_col = col_count
-                break
-        
-        # Convert column number to Excel column letter
-        def number_to_excel_column(n):
-            """Convert 1-based column number to Excel column letter (1=A, 10=J, 29=AC)"""
-            result = ""
-            while n > 0:
-                n -= 1
-                result = chr(65 + (n % 26)) + result
-                n //= 26
-            return result
-        
-        # Hardcode AC as the last column (column 29) as per user requirement
-        first_col_letter = number_to_excel_column(first_validation_excel_col) if first_validation_excel_col else "J"
-        last_col_letter = "AC"  # Fixed to AC (column 29) as specified
-        
-        # Write data rows with comments
-        for row_idx, row_data in enumerate(broker_rows, start=2):
-            for col_idx, header in enumerate(display_headers, start=1):
-                value = row_data.get(header, "")
-                
-                # Set formulas for audit scores if we have the column indices
-                if col_idx == errors_col_idx:
-                    # Formula: =COUNTIF($J3:$AC3,"No") - using relative row reference
-                    formula = f'=COUNTIF(${first_col_letter}{row_idx}:${last_col_letter}{row_idx},"No")'
-                    cell = sheet.cell(row=row_idx, column=col_idx, value=formula)
-                elif col_idx == total_col_idx:
-                    # Formula: =COUNTIF($J3:$AC3,"<>N/A") - using relative row reference
-                    formula = f'=COUNTIF(${first_col_letter}{row_idx}:${last_col_letter}{row_idx},"<>N/A")'
-                    cell = sheet.cell(row=row_idx, column=col_idx, value=formula)
-                else:
-                    cell = sheet.cell(row=row_idx, column=col_idx, value=value)
 
-                # Wrap text for long cells
-                cell.alignment = Alignment(wrap_text=True, vertical="top")
-
-                # Yellow background for "No" values
-                if value == "No":
-                    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-                    cell.fill = yellow_fill
-
-                # Add comment with reasoning if this is a validation column
-                if header in validation_reasoning_map:
-                    reasoning_header = validation_reasoning_map[header]
-                    reasoning = row_data.get(reasoning_header, "").strip()
-                    if reasoning:
-                        # Create comment with reasoning
-                        comment = Comment(reasoning, "Audit System")
-                        cell.comment = comment
-        
         # Auto-adjust column widths (approximate)
-        for col_idx, header in enumerate(display_headers, start=1):
-            col_letter = sheet.cell(row=1, column=col_idx).column_letter
+        for col_idx, header in enumerate(DISPLAY_HEADERS, start=1):
+            col_letter = EXCEL_COL_LETTERS[col_idx - 1]
             # Set reasonable default widths
             if "Date" in header:
                 sheet.column_dimensions[col_letter].width = 12
@@ -1332,20 +1702,74 @@ def write_audit_xlsx(
                 sheet.column_dimensions[col_letter].width = 25
             else:
                 sheet.column_dimensions[col_letter].width = max(len(header) + 2, 12)
+        
+        sheet.append(header_row(sheet, DISPLAY_HEADERS, Alignment(horizontal="center", vertical="center", wrap_text=True)))
+        
+        # Stream data rows with comments
+        for row_cells in _build_broker_cells(broker_rows):
+            cells = []
+            for value, is_no, reasoning in row_cells:
+                cell = WriteOnlyCell(sheet, value=value)
+
+                # Wrap text for long cells
+                cell.alignment = data_alignment
+
+                # Yellow background for "No" values
+                if is_no:
+                    cell.fill = yellow_fill
+
+                # Add comment with reasoning if this is a validation column
+                if reasoning:
+                    cell.comment = Comment(reasoning, "Audit System")
+                
+                cells.append(cell)
+            sheet.append(cells)
     
     # Save workbook
-    wb.save(output_path)
+    _save_workbook(wb, output_path)
     
     print(f"\n📊 XLSX written: {output_path}", flush=True)
     print(f"   Summary sheet: {len(summary_rows)} jobs", flush=True)
     print(f"   Broker sheets: {len(broker_groups)} brokers", flush=True)
     print(f"   Validation comments added to cells", flush=True)
-    for broker_name, rows in sorted(broker_groups.items()):
+    for broker_name, rows in broker_groups.items():
         print(f"      - {broker_name}: {len(rows)} jobs", flush=True)
     
     return output_path
 
 
+class _BatchTotals:
+    """Running job counts and token usage for a process_grouped_jobs_nz() batch."""
+    def __init__(self):
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.requests = 0
+
+
+def _handle_token_usage(result: Dict[str, Any], totals: _BatchTotals) -> None:
+    """Count one finished job and print its token usage (or failure)."""
+    job_id = result["job_id"]
+    if result.get("skipped"):
+        totals.skipped += 1
+        # Don't print skipped jobs in token usage section (already printed during processing)
+    elif result["success"]:
+        totals.successful += 1
+        
+        # Collect token usage
+        if result["token_usage"]:
+            usage = result["token_usage"]
+            totals.input_tokens += usage.input_tokens
+            totals.output_tokens += usage.output_tokens
+            totals.requests += usage.requests
+            print(f"   Job {job_id}: input={usage.input_tokens:,}, output={usage.output_tokens:,}, total={usage.total_tokens:,}", flush=True)
+    else:
+        totals.failed += 1
+        print(f"   Job {job_id}: FAILED - {result.get('error', 'Unknown error')}", flush=True)
+
+
 async def process_grouped_jobs_nz(
     grouped_folder: Path,
     broker_name: str = "",
@@ -1363,7 +1787,7 @@ async def process_grouped_jobs_nz(
        - Copies PDF files to output job folder
        - Runs the NZ audit
        - Saves individual job CSV in job folder
-       - Creates .audit_complete marker in INPUT job folder on success
+       - Creates .audit_complete marker in INPUT job folder on success (written in batches)
     4. Outputs a combined CSV with all job results in run folder
     
     Args:
@@ -1428,19 +1852,16 @@ async def process_grouped_jobs_nz(
     
     print(f"📄 Output files ready: {combined_csv_path.name}, {combined_xlsx_path.name}", flush=True)
     
-    # Find all job folders
-    job_folders = [
-        f for f in grouped_folder.iterdir() 
-        if f.is_dir() and f.name.startswith("job_")
-    ]
+    # Find all job folders (PDFs and completion markers are read in the same pass)
+    jobs = _discover_jobs(grouped_folder)
     
-    if not job_folders:
+    if not jobs:
         raise ValueError(f"No job folders found in {grouped_folder}")
 
     # Recovery: if completed jobs have results in prior run folders but not in current CSV,
     # rebuild the CSV from individual job CSVs across all run directories.
     existing_csv_rows = _load_existing_csv_results(combined_csv_path)
-    completed_markers = sum(1 for f in job_folders if (f / AUDIT_COMPLETE_MARKER).exists())
+    completed_markers = sum(1 for job in jobs if job.completed)
     if completed_markers > 0 and len(existing_csv_rows) < completed_markers:
         print(f"   🔧 CSV recovery: {len(existing_csv_rows)} rows in CSV but {completed_markers} completed jobs", flush=True)
         recovered = 0
@@ -1463,152 +1884,184 @@ async def process_grouped_jobs_nz(
                                 recovered += 1
                     except Exception:
                         pass
+        finalize_csv(combined_csv_path)
         if recovered > 0:
             print(f"      ✅ Recovered {recovered} rows from previous runs", flush=True)
 
-    completed_count = sum(1 for f in job_folders if (f / AUDIT_COMPLETE_MARKER).exists())
-    pending_count = len(job_folders) - completed_count
-    print(f"Found {len(job_folders)} job folder(s): {completed_count} completed, {pending_count} pending", flush=True)
+    completed_count = completed_markers
+    pending_count = len(jobs) - completed_count
+    print(f"Found {len(jobs)} job folder(s): {completed_count} completed, {pending_count} pending", flush=True)
     print(f"🚀 Processing with {MAX_CONCURRENT_JOBS} concurrent workers", flush=True)
 
     # Save metadata early so resume works even if interrupted
     _save_run_metadata(grouped_folder, run_id, run_path, combined_csv_path, combined_xlsx_path)
 
-    # Semaphore to limit concurrent jobs
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
-
     # Track progress (mutable counters for closure access)
     progress_completed = [0]
     progress_failed = [0]
     progress_skipped = [0]
 
-    async def process_single_job(job_folder: Path, csv_path: Path, xlsx_path: Path) -> Dict[str, Any]:
-        """Process a single job with semaphore-limited concurrency."""
-        async with semaphore:
-            job_id = job_folder.name.replace("job_", "")
-            marker_file = job_folder / AUDIT_COMPLETE_MARKER
-
-            # Always skip completed jobs (resume support)
-            if marker_file.exists():
-                print(f"   ⏭️  Job {job_id} already completed, skipping...", flush=True)
-                progress_skipped[0] += 1
-                _write_progress(run_path, progress_completed[0], progress_failed[0], len(job_folders), progress_skipped[0])
-                return {
-                    "job_id": job_id, "success": True, "skipped": True,
-                    "error": None, "job_folder": None, "csv_path": None,
-                    "result": None, "token_usage": None
-                }
-
-            # Get all PDF files in the job folder
-            pdf_files = list(job_folder.glob("*.pdf")) + list(job_folder.glob("*.PDF"))
-
-            if not pdf_files:
-                print(f"⚠️  No PDF files in {job_folder.name}, skipping...", flush=True)
-                progress_failed[0] += 1
-                _write_progress(run_path, progress_completed[0], progress_failed[0], len(job_folders), progress_skipped[0])
-                return {
-                    "job_id": job_id, "success": False, "skipped": False,
-                    "error": "No PDF files found", "job_folder": None,
-                    "csv_path": None, "result": None, "token_usage": None
-                }
-
-            # Create job folder in output
-            output_job_path = create_job_directory(run_path, job_id)
-
-            # Retry with exponential backoff for transient API failures
-            last_error = None
-            for attempt in range(1, MAX_RETRIES + 1):
-                try:
-                    audit_result, token_usage = await run_nz_audit(
-                        job_id=job_id,
-                        pdf_files=pdf_files,
-                        broker_name=broker_name,
-                        output_job_path=output_job_path
-                    )
-
-                    row = create_csv_row(audit_result)
+    async def process_single_job(job: JobDescriptor, csv_path: Path, xlsx_path: Path) -> Dict[str, Any]:
+        """Process a single job (called by one of the batch's worker tasks)."""
+        job_id = job.job_id
+        job_folder = job.folder
 
-                    # Save individual job CSV
-                    job_csv_path = output_job_path / f"nz_audit_{job_id}.csv"
-                    write_audit_csv([row], job_csv_path)
+        # Always skip completed jobs (resume support) - no filesystem access needed
+        if job.completed:
+            print(f"   ⏭️  Job {job_id} already completed, skipping...", flush=True)
+            progress_skipped[0] += 1
+            _write_progress(run_path, progress_completed[0], progress_failed[0], len(jobs), progress_skipped[0])
+            return {
+                "job_id": job_id, "success": True, "skipped": True,
+                "error": None, "job_folder": None, "csv_path": None,
+                "result": None, "token_usage": None
+            }
 
-                    # Append to combined CSV and XLSX immediately
-                    try:
-                        append_csv_row(row, csv_path)
-                        await append_xlsx_row(row, xlsx_path)
-                    except Exception as e:
-                        print(f"   ⚠️  Job {job_id} completed but failed to append to combined files: {e}", flush=True)
-
-                    # Mark job as complete
-                    marker_file.write_text(f"Completed: {run_id}\n")
-                    progress_completed[0] += 1
-                    _write_progress(run_path, progress_completed[0], progress_failed[0], len(job_folders), progress_skipped[0])
-
-                    return {
-                        "job_id": job_id, "success": True, "skipped": False,
-                        "error": None, "job_folder": str(output_job_path),
-                        "csv_path": str(job_csv_path), "result": row,
-                        "token_usage": token_usage
-                    }
-                except Exception as e:
-                    last_error = e
-                    if attempt < MAX_RETRIES:
-                        delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
-                        print(f"⚠️  Job {job_id} attempt {attempt}/{MAX_RETRIES} failed: {e}. Retrying in {delay}s...", flush=True)
-                        await asyncio.sleep(delay)
-                    else:
-                        print(f"❌ Job {job_id} failed after {MAX_RETRIES} attempts: {e}", flush=True)
+        # PDF files in the job folder, found during discovery
+        pdf_files = list(job.pdfs)
 
+        if not pdf_files:
+            print(f"⚠️  No PDF files in {job_folder.name}, skipping...", flush=True)
             progress_failed[0] += 1
-            _write_progress(run_path, progress_completed[0], progress_failed[0], len(job_folders), progress_skipped[0])
+            _write_progress(run_path, progress_completed[0], progress_failed[0], len(jobs), progress_skipped[0])
             return {
                 "job_id": job_id, "success": False, "skipped": False,
-                "error": str(last_error), "job_folder": str(output_job_path),
+                "error": "No PDF files found", "job_folder": None,
                 "csv_path": None, "result": None, "token_usage": None
             }
 
-    # Process all jobs in parallel with limited concurrency
-    tasks = [process_single_job(job_folder, combined_csv_path, combined_xlsx_path) for job_folder in sorted(job_folders)]
-    job_results = await asyncio.gather(*tasks)
+        # Create job folder in output
+        output_job_path = create_job_directory(run_path, job_id)
+
+        # Retry with exponential backoff for transient API failures
+        last_error = None
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                audit_result, token_usage = await run_nz_audit(
+                    job_id=job_id,
+                    pdf_files=pdf_files,
+                    broker_name=broker_name,
+                    output_job_path=output_job_path
+                )
+
+                row = create_csv_row(audit_result)
+
+                # Save individual job CSV
+                job_csv_path = output_job_path / f"nz_audit_{job_id}.csv"
+                write_audit_csv([row], job_csv_path)
+
+                # Append to combined CSV immediately; XLSX rows are flushed in batches.
+                # No extra locks needed: append_csv_row and the pending-row swap never
+                # await, so jobs can't interleave inside them, and flush_xlsx_rows
+                # serializes on _xlsx_update_lock and the single-thread XLSX_EXECUTOR.
+                try:
+                    append_csv_row(row, csv_path)
+                    pending_xlsx_rows.append(row)
+                    if len(pending_xlsx_rows) >= XLSX_FLUSH_INTERVAL:
+                        # Swap the buffer out before awaiting so other jobs keep appending
+                        batch = pending_xlsx_rows[:]
+                        pending_xlsx_rows.clear()
+                        await flush_xlsx_rows(batch, xlsx_path)
+                except Exception as e:
+                    print(f"   ⚠️  Job {job_id} completed but failed to append to combined files: {e}", flush=True)
+
+                # Mark job as complete
+                await marker_sink.add(job.marker, f"Completed: {run_id}\n")
+                progress_completed[0] += 1
+                _write_progress(run_path, progress_completed[0], progress_failed[0], len(jobs), progress_skipped[0])
+
+                return {
+                    "job_id": job_id, "success": True, "skipped": False,
+                    "error": None, "job_folder": str(output_job_path),
+                    "csv_path": str(job_csv_path), "result": row,
+                    "token_usage": token_usage
+                }
+            except Exception as e:
+                last_error = e
+                if attempt < MAX_RETRIES:
+                    delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                    print(f"⚠️  Job {job_id} attempt {attempt}/{MAX_RETRIES} failed: {e}. Retrying in {delay}s...", flush=True)
+                    await asyncio.sleep(delay)
+                else:
+                    print(f"❌ Job {job_id} failed after {MAX_RETRIES} attempts: {e}", flush=True)
+
+        progress_failed[0] += 1
+        _write_progress(run_path, progress_completed[0], progress_failed[0], len(jobs), progress_skipped[0])
+        return {
+            "job_id": job_id, "success": False, "skipped": False,
+            "error": str(last_error), "job_folder": str(output_job_path),
+            "csv_path": None, "result": None, "token_usage": None
+        }
 
-    # Write final progress
-    _write_progress(run_path, progress_completed[0], progress_failed[0], len(job_folders), progress_skipped[0], is_running=False)
-    
-    # Collect results and token usage
-    all_results: List[Dict[str, str]] = []
-    successful = 0
-    failed = 0
-    skipped = 0
-    
-    # Track total token usage
-    total_input_tokens = 0
-    total_output_tokens = 0
-    total_requests = 0
-    
     print(f"\n{'='*80}", flush=True)
     print(f"📊 TOKEN USAGE BY JOB", flush=True)
     print(f"{'='*80}", flush=True)
+
+    # Rows waiting for the next batched XLSX flush
+    pending_xlsx_rows: List[Dict[str, str]] = []
+
+    # Completion markers are batched; flush the tail on exit even if interrupted
+    marker_sink = MarkerSink(combined_csv_path)
+    atexit.register(marker_sink.flush_sync)
+
+    # Process jobs with a fixed pool of workers fed from a bounded queue, so only
+    # MAX_CONCURRENT_JOBS jobs (and at most 2x that many queued folders) exist at once
+    job_results: List[Dict[str, Any]] = []
+    totals = _BatchTotals()
+    worker_count = min(MAX_CONCURRENT_JOBS, len(jobs))
+    job_queue: asyncio.Queue[JobDescriptor | None] = asyncio.Queue(maxsize=MAX_CONCURRENT_JOBS * 2)
+
+    async def produce_jobs() -> None:
+        for job in jobs:
+            await job_queue.put(job)
+        # One sentinel per worker
+        for _ in range(worker_count):
+            await job_queue.put(None)
+
+    async def job_worker() -> None:
+        # Each worker exits on its sentinel, so once all tasks finish every job has
+        # been processed; no task_done()/join() bookkeeping is needed
+        while (job := await job_queue.get()) is not None:
+            result = await process_single_job(job, combined_csv_path, combined_xlsx_path)
+            # Tally each job as it finishes rather than after the whole batch
+            job_results.append(result)
+            _handle_token_usage(result, totals)
+
+    tasks = [asyncio.create_task(produce_jobs())]
+    tasks.extend(asyncio.create_task(job_worker()) for _ in range(worker_count))
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # A dead worker must not leave its siblings appending rows to the files
+        # finalized below, nor the producer blocked putting a sentinel no one takes
+        for task in tasks:
+            task.cancel()
+        # Wait for the cancellations so no task is left pending or unretrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        await marker_sink.flush()
+        atexit.unregister(marker_sink.flush_sync)
+        finalize_csv(combined_csv_path)
+        # The combined CSV holds every row (deduplicated by HAWB); stream the final XLSX
+        # from it. Rows still buffered for the open workbook are only used as a fallback.
+        await finalize_xlsx(combined_xlsx_path, _load_existing_csv_results(combined_csv_path), pending_xlsx_rows)
+
+    # Write final progress
+    _write_progress(run_path, progress_completed[0], progress_failed[0], len(jobs), progress_skipped[0], is_running=False)
     
-    for result in job_results:
-        job_id = result["job_id"]
-        if result.get("skipped"):
-            skipped += 1
-            # Don't print skipped jobs in token usage section (already printed during processing)
-        elif result["success"]:
-            successful += 1
-            if result["result"]:
-                all_results.append(result["result"])
-            
-            # Collect token usage
-            if result["token_usage"]:
-                usage = result["token_usage"]
-                total_input_tokens += usage.input_tokens
-                total_output_tokens += usage.output_tokens
-                total_requests += usage.requests
-                print(f"   Job {job_id}: input={usage.input_tokens:,}, output={usage.output_tokens:,}, total={usage.total_tokens:,}", flush=True)
-        else:
-            failed += 1
-            print(f"   Job {job_id}: FAILED - {result.get('error', 'Unknown error')}", flush=True)
+    # Report jobs in folder order, as before
+    job_results.sort(key=lambda r: r["job_id"])
+    all_results: List[Dict[str, str]] = [
+        r["result"] for r in job_results
+        if r["success"] and not r.get("skipped") and r["result"]
+    ]
+    successful = totals.successful
+    failed = totals.failed
+    skipped = totals.skipped
+    total_input_tokens = totals.input_tokens
+    total_output_tokens = totals.output_tokens
+    total_requests = totals.requests
     
     # Files are already created and updated incrementally, so no need to write them again
     # Just verify they exist
@@ -1627,7 +2080,7 @@ async def process_grouped_jobs_nz(
     print(f"{'='*80}", flush=True)
     print(f"   Run ID: {run_id}", flush=True)
     print(f"   Output: {run_path}", flush=True)
-    print(f"   Total jobs: {len(job_folders)}", flush=True)
+    print(f"   Total jobs: {len(jobs)}", flush=True)
     if skipped > 0:
         print(f"   Skipped (already complete): {skipped}", flush=True)
     print(f"   Processed this run: {successful + failed}", flush=True)
@@ -1645,7 +2098,7 @@ async def process_grouped_jobs_nz(
     return {
         "run_id": run_id,
         "run_path": str(run_path),
-        "total_jobs": len(job_folders),
+        "total_jobs": len(jobs),
         "successful_jobs": successful,
         "failed_jobs": failed,
         "skipped_jobs": skipped,
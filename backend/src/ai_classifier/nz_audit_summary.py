@@ -9,6 +9,7 @@ This module:
 """
 from __future__ import annotations
 
+import functools
 import re
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
@@ -53,6 +54,24 @@ ERROR_CATEGORY_MAPPING = {
     "CGO (for Exports, where applicable)": "CGO incorrect",
 }
 
+# Summary sheet styles, shared by every broker row
+_THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+# Thicker left border for the error breakdown cell
+_THICK_LEFT_BORDER = Border(
+    left=Side(style='medium'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+# Inline fonts for rich text
+_RED_INLINE = InlineFont(color="00FF0000")  # Red color (with alpha)
+_BLACK_INLINE = InlineFont(color="00000000")  # Black color
+
 # Error categories to display in the summary (in order)
 DISPLAY_ERROR_CATEGORIES = [
     "Incorrect parts concession (302913B ) use:",
@@ -69,17 +88,47 @@ DISPLAY_ERROR_CATEGORIES = [
 ]
 
 
+# Whitespace runs (including newlines) collapsed by normalize_header
+_WS_RE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_header(header: str) -> str:
     """
     Normalize header text for matching by removing extra whitespace and newlines.
+    Memoized - the same few header strings are normalized for every row.
     """
     if not header:
         return ""
     # Replace newlines with space and collapse multiple spaces
-    normalized = re.sub(r'\s+', ' ', str(header).strip())
+    normalized = _WS_RE.sub(' ', str(header).strip())
     return normalized
 
 
+# Columns to exclude from additional errors (not validation columns), matched as substrings
+_EXCLUDE_COLUMNS = (
+    "status", "audit month", "tl", "broker", "dhl job", "hawb", "import/export",
+    "entry number", "entry date", "date audited", "auditor", "comments",
+    "audit score", "errors", "total", "reasoning"
+)
+
+# (normalized lowercase mapping header, category name), in ERROR_CATEGORY_MAPPING order
+_CATEGORY_PATTERNS = tuple(
+    (normalize_header(header).lower(), category_name)
+    for header, category_name in ERROR_CATEGORY_MAPPING.items()
+)
+
+
+def _category_pattern_hits(col_lower: str) -> set:
+    """Return the category patterns contained in a normalized lowercase header."""
+    return {pattern for pattern, _ in _CATEGORY_PATTERNS if pattern in col_lower}
+
+
+def _is_excluded_column(col_lower: str) -> bool:
+    """Check whether a normalized lowercase header contains any excluded name."""
+    return any(excl in col_lower for excl in _EXCLUDE_COLUMNS)
+
+
 def find_column_index(headers: List[str], target_patterns: List[str]) -> int | None:
     """
     Find column index by matching against multiple possible patterns.
@@ -133,7 +182,7 @@ def read_broker_sheet(sheet) -> Tuple[List[Dict[str, Any]], List[str]]:
     Read all rows from a broker sheet.
     
     Args:
-        sheet: openpyxl worksheet object
+        sheet: openpyxl worksheet object (read-only worksheets are streamed in one pass)
         
     Returns:
         Tuple of (list of row dicts, list of headers)
@@ -141,16 +190,17 @@ def read_broker_sheet(sheet) -> Tuple[List[Dict[str, Any]], List[str]]:
     rows = []
     headers = []
     
+    sheet_rows = sheet.iter_rows(values_only=True)
+    
     # Read headers from first row
-    for cell in sheet[1]:
-        headers.append(str(cell.value) if cell.value else "")
+    header_row = next(sheet_rows, None)
+    if header_row is None:
+        return rows, headers
+    headers = [str(value) if value else "" for value in header_row]
     
-    # Read data rows
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        row_dict = {}
-        for col_idx, value in enumerate(row):
-            if col_idx < len(headers):
-                row_dict[headers[col_idx]] = value
+    # Read data rows (zip drops cells beyond the header row)
+    for row in sheet_rows:
+        row_dict = dict(zip(headers, row))
         
         # Skip empty rows
         if any(v for v in row_dict.values() if v):
@@ -159,6 +209,19 @@ def read_broker_sheet(sheet) -> Tuple[List[Dict[str, Any]], List[str]]:
     return rows, headers
 
 
+def _score_value(value: Any) -> int:
+    """Coerce an audit score cell (formula result, number or digit string) to int; 0 otherwise."""
+    # Handle formula results and numeric values
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        if value and str(value).isdigit():
+            return int(value)
+    except (ValueError, TypeError):
+        pass
+    return 0
+
+
 def calculate_broker_accuracy(rows: List[Dict[str, Any]], headers: List[str]) -> float:
     """
     Calculate accuracy for a broker: 1 - (sum of errors / sum of total)
@@ -178,29 +241,10 @@ def calculate_broker_accuracy(rows: List[Dict[str, Any]], headers: List[str]) ->
         # Try to calculate from raw values
         return 0.0
     
-    total_errors = 0
-    total_total = 0
-    
-    for row in rows:
-        errors_val = row.get(headers[errors_col], 0)
-        total_val = row.get(headers[total_col], 0)
-        
-        # Handle formula results and numeric values
-        try:
-            if isinstance(errors_val, (int, float)):
-                total_errors += int(errors_val)
-            elif errors_val and str(errors_val).isdigit():
-                total_errors += int(errors_val)
-        except (ValueError, TypeError):
-            pass
-        
-        try:
-            if isinstance(total_val, (int, float)):
-                total_total += int(total_val)
-            elif total_val and str(total_val).isdigit():
-                total_total += int(total_val)
-        except (ValueError, TypeError):
-            pass
+    errors_header = headers[errors_col]
+    total_header = headers[total_col]
+    total_errors = sum(_score_value(row.get(errors_header, 0)) for row in rows)
+    total_total = sum(_score_value(row.get(total_header, 0)) for row in rows)
     
     if total_total == 0:
         return 1.0  # No validations = 100% accuracy
@@ -224,51 +268,52 @@ def count_errors_by_category(rows: List[Dict[str, Any]], headers: List[str]) ->
     error_counts = defaultdict(int)
     additional_errors = defaultdict(int)
     
-    # Build set of mapped column headers (normalized)
-    mapped_headers_normalized = set()
-    for header in ERROR_CATEGORY_MAPPING.keys():
-        mapped_headers_normalized.add(normalize_header(header).lower())
-    
-    # Columns to exclude from additional errors (not validation columns)
-    exclude_columns = {
-        "status", "audit month", "tl", "broker", "dhl job", "hawb", "import/export",
-        "entry number", "entry date", "date audited", "auditor", "comments",
-        "audit score", "errors", "total", "reasoning"
-    }
+    # Normalize + lowercase each header once; reused for matching and exclusion
+    norm_lower_headers: Dict[str, str] = {h: normalize_header(h).lower() for h in headers}
+    
+    # Scan each header once for every category pattern it contains
+    header_hits = [
+        (col_header, _category_pattern_hits(col_norm_lower))
+        for col_header, col_norm_lower in norm_lower_headers.items()
+    ]
+    
+    # Match columns to categories once - the answer is the same for every row
+    category_cols: List[Tuple[str, str]] = []
+    matched_col_set = set()
+    for pattern, category_name in _CATEGORY_PATTERNS:
+        for col_header, hits in header_hits:
+            if pattern in hits:
+                category_cols.append((col_header, category_name))
+                matched_col_set.add(col_header)
+                break
+    
+    # Remaining validation columns count as additional errors, under a cleaned-up name
+    additional_cols: List[Tuple[str, str]] = []
+    for col_header in headers:
+        if col_header in matched_col_set:
+            continue
+        
+        # Skip non-validation columns
+        if _is_excluded_column(norm_lower_headers[col_header]):
+            continue
+        
+        clean_name = normalize_header(col_header)
+        # Shorten long names
+        if len(clean_name) > 30:
+            clean_name = clean_name[:27] + "..."
+        additional_cols.append((col_header, clean_name))
     
     for row in rows:
-        matched_columns = set()
-        
         # Count predefined category errors
-        for header, category_name in ERROR_CATEGORY_MAPPING.items():
-            normalized_header = normalize_header(header)
-            
-            for col_header in headers:
-                if normalize_header(col_header) == normalized_header or \
-                   normalized_header.lower() in normalize_header(col_header).lower():
-                    value = row.get(col_header, "")
-                    if value and str(value).strip().lower() == "no":
-                        error_counts[category_name] += 1
-                    matched_columns.add(col_header)
-                    break
+        for col_header, category_name in category_cols:
+            value = row.get(col_header, "")
+            if value and str(value).strip().lower() == "no":
+                error_counts[category_name] += 1
         
         # Count additional errors (columns with "No" not in predefined categories)
-        for col_header in headers:
-            if col_header in matched_columns:
-                continue
-            
-            # Skip non-validation columns
-            col_lower = normalize_header(col_header).lower()
-            if any(excl in col_lower for excl in exclude_columns):
-                continue
-            
+        for col_header, clean_name in additional_cols:
             value = row.get(col_header, "")
             if value and str(value).strip().lower() == "no":
-                # Use a cleaned-up column name
-                clean_name = normalize_header(col_header)
-                # Shorten long names
-                if len(clean_name) > 30:
-                    clean_name = clean_name[:27] + "..."
                 additional_errors[clean_name] += 1
     
     return dict(error_counts), dict(additional_errors)
@@ -304,43 +349,50 @@ def process_audit_file(
         sheet_names = wb.sheet_names()
     else:
         # .xlsx format - use openpyxl
-        wb = load_workbook(input_path, data_only=True)  # data_only=True to get calculated formula values
+        # data_only=True to get calculated formula values; read_only streams rows
+        # instead of building a Cell object per cell
+        wb = load_workbook(input_path, data_only=True, read_only=True)
         sheet_names = wb.sheetnames
 
     broker_results = {}
-    all_errors = defaultdict(lambda: defaultdict(int))
 
-    # Process each sheet (skip Summary if present)
-    for sheet_name in sheet_names:
-        if sheet_name.lower() == "summary":
-            continue
+    try:
+        # Process each sheet (skip Summary if present)
+        for sheet_name in sheet_names:
+            if sheet_name.lower() == "summary":
+                continue
 
-        if is_xls:
-            sheet = wb.sheet_by_name(sheet_name)
-            rows, headers = read_xls_sheet(sheet)
-        else:
-            sheet = wb[sheet_name]
-            rows, headers = read_broker_sheet(sheet)
-        
-        if not rows:
-            continue
+            if is_xls:
+                sheet = wb.sheet_by_name(sheet_name)
+                rows, headers = read_xls_sheet(sheet)
+            else:
+                sheet = wb[sheet_name]
+                rows, headers = read_broker_sheet(sheet)
         
-        # Calculate accuracy
-        accuracy = calculate_broker_accuracy(rows, headers)
+            if not rows:
+                continue
         
-        # Count errors by category (returns tuple of categorized and additional)
-        error_counts, additional_errors = count_errors_by_category(rows, headers)
+            # Calculate accuracy
+            accuracy = calculate_broker_accuracy(rows, headers)
         
-        broker_results[sheet_name] = {
-            "accuracy": accuracy,
-            "error_counts": error_counts,
-            "additional_errors": additional_errors,
-            "total_rows": len(rows)
-        }
+            # Count errors by category (returns tuple of categorized and additional)
+            error_counts, additional_errors = count_errors_by_category(rows, headers)
         
-        # Aggregate errors
-        for category, count in error_counts.items():
-            all_errors[sheet_name][category] = count
+            broker_results[sheet_name] = {
+                "accuracy": accuracy,
+                "error_counts": error_counts,
+                "additional_errors": additional_errors,
+                "total_rows": len(rows)
+            }
+    finally:
+        if is_xls:
+            wb.release_resources()
+        else:
+            # Read-only workbooks keep the file open until closed
+            wb.close()
+    
+    # Drop the input workbook before building the output one so both don't peak together
+    del wb
     
     # Generate output workbook
     output_wb = Workbook()
@@ -355,12 +407,7 @@ def process_audit_file(
     # Styles
     header_fill = PatternFill(start_color="C6D9F0", end_color="C6D9F0", fill_type="solid")
     header_font = Font(bold=True, color="000000")  # Black text on light blue background
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    thin_border = _THIN_BORDER
     
     # Write header row
     headers = ["Broker", month]
@@ -403,10 +450,6 @@ def process_audit_file(
         # Track which error categories are displayed in the predefined list
         displayed_categories = set()
         
-        # Define inline fonts for rich text
-        red_inline = InlineFont(color="00FF0000")  # Red color (with alpha)
-        black_inline = InlineFont(color="00000000")  # Black color
-        
         # Build error list and collect additional content
         error_lines = []
         additional_content = ""
@@ -448,33 +491,33 @@ def process_audit_file(
             else:
                 error_lines.append((category, "", False))  # no count
         
-        # Build rich text with red counts
-        rich_parts = []
+        # Build rich text with red counts (at most 3 parts per line plus the Additional line)
+        rich_parts: List[Any] = [None] * (3 * len(error_lines) + 3)
+        idx = 0
         for i, (cat_text, count_text, has_count) in enumerate(error_lines):
             if i > 0:
-                rich_parts.append("\n")
-            rich_parts.append(TextBlock(black_inline, cat_text))
+                rich_parts[idx] = "\n"
+                idx += 1
+            rich_parts[idx] = TextBlock(_BLACK_INLINE, cat_text)
+            idx += 1
             if has_count:
-                rich_parts.append(TextBlock(red_inline, count_text))
+                rich_parts[idx] = TextBlock(_RED_INLINE, count_text)
+                idx += 1
         
         # Add Additional line
-        rich_parts.append("\n")
-        rich_parts.append(TextBlock(black_inline, "Additional: "))
+        rich_parts[idx] = "\n"
+        rich_parts[idx + 1] = TextBlock(_BLACK_INLINE, "Additional: ")
+        idx += 2
         if additional_content:
-            rich_parts.append(TextBlock(red_inline, additional_content))
+            rich_parts[idx] = TextBlock(_RED_INLINE, additional_content)
+            idx += 1
+        del rich_parts[idx:]
         
         # Write error categories in column B using rich text
         error_cell = summary_sheet.cell(row=current_row, column=2)
         error_cell.value = CellRichText(rich_parts)
         error_cell.alignment = Alignment(wrap_text=True, vertical="top")
-        # Thicker left border for breakdown cell
-        thick_left_border = Border(
-            left=Side(style='medium'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        error_cell.border = thick_left_border
+        error_cell.border = _THICK_LEFT_BORDER
         
         # Adjust row height for wrapped content
         # Add extra height (3 rows worth = 45) for the Additional line which can wrap
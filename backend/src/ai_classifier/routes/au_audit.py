@@ -2,10 +2,15 @@
 AU Audit API Routes - Endpoints for Australian customs audit.
 """
 import asyncio
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+import functools
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -13,9 +18,12 @@ from ..au_audit import (
     process_grouped_jobs_au,
     clear_audit_markers,
     AUDIT_COMPLETE_MARKER,
+    RUN_METADATA_FILE,
     _load_run_metadata,
+    _load_existing_csv_results,
     _load_progress,
 )
+from ..file_manager import get_output_base_dir
 from ..util.batch_processor import get_input_folder_path
 
 
@@ -24,6 +32,26 @@ router = APIRouter(prefix="/api/au-audit", tags=["AU Audit"])
 # Track background audit tasks (keyed by folder_name)
 _active_audits: Dict[str, asyncio.Task] = {}
 
+# Threads for counting jobs in several grouped folders at once (I/O bound)
+_SCAN_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="au-scan")
+
+
+# Header validation columns the AI fills in (default "") and static columns (default "1")
+_AI_VALIDATION_KEYS = (
+    "OC", "SC", "VALUATION", "ORIGIN", "FTA",
+    "PRS/PRT", "CURRENCY", "INCOTERMS", "T & I", "OTH/DISC",
+)
+_STATIC_VALIDATION_KEYS = (
+    "CP QUESTIONS", "RELATED TRANSACTION", "NOTES", "AQIS", "PERMITS", "OTHER",
+)
+
+
+def _header_validation(row: Dict[str, Any]) -> Dict[str, str]:
+    """Build the header_validation dict for a job result row."""
+    validation = {key: row.get(key, "") for key in _AI_VALIDATION_KEYS}
+    validation.update((key, row.get(key, "1")) for key in _STATIC_VALIDATION_KEYS)
+    return validation
+
 
 class AUAuditJobResult(BaseModel):
     """Result for a single job audit."""
@@ -72,79 +100,185 @@ class ListGroupedFoldersResponse(BaseModel):
     folders: List[GroupedFolderInfo]
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists this ETag (weak comparison) or is "*"."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _json_with_etag(request: Request, payload: Dict[str, Any]) -> Response:
+    """Render a JSON payload with a content ETag, answering 304 if the client has it.
+
+    The ETag hashes the body rather than folder mtimes: completion markers are
+    written inside job folders and don't change the grouped folder's mtime.
+    The scan and serialization still run on every poll; a 304 only saves
+    sending the body.
+    """
+    body = orjson.dumps(payload)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _count_jobs(grouped_folder: Path) -> Tuple[int, int]:
+    """Count (job folders, completed job folders) in a grouped folder."""
+    job_count = 0
+    completed_count = 0
+    with os.scandir(grouped_folder) as it:
+        for entry in it:
+            if entry.name.startswith("job_") and entry.is_dir(follow_symlinks=False):
+                job_count += 1
+                if os.path.exists(os.path.join(entry.path, AUDIT_COMPLETE_MARKER)):
+                    completed_count += 1
+    return job_count, completed_count
+
+
+def _scan_grouped_folders(input_folder: Path) -> List[GroupedFolderInfo]:
+    """Blocking scan of grouped folders; runs in a worker thread.
+
+    Completion markers are written inside job folders (by AU/NZ audits and
+    external scripts alike), so counts are always read fresh from disk.
+    """
+    folders = []
+    for item in input_folder.iterdir():
+        if item.is_dir() and item.name.startswith("grouped_"):
+            folders.append((item, item.stat()))
+
+    # Count jobs in all folders concurrently so their stat latency overlaps
+    grouped_folders = []
+    counts = _SCAN_POOL.map(_count_jobs, [item for item, _ in folders])
+    for (item, st), (job_count, completed_count) in zip(folders, counts):
+        created = datetime.fromtimestamp(st.st_mtime).isoformat()
+        info = GroupedFolderInfo(
+            name=item.name,
+            path=str(item),
+            job_count=job_count,
+            completed_jobs=completed_count,
+            pending_jobs=job_count - completed_count,
+            created=created
+        )
+        grouped_folders.append(info)
+    grouped_folders.sort(key=lambda x: x.created, reverse=True)
+    return grouped_folders
+
+
 @router.get("/grouped-folders", response_model=ListGroupedFoldersResponse)
-async def list_grouped_folders():
+async def list_grouped_folders(request: Request):
     input_folder = get_input_folder_path()
     if not input_folder.exists():
         raise HTTPException(status_code=404, detail=f"Input folder not found: {input_folder}")
 
-    grouped_folders = []
-    for item in input_folder.iterdir():
-        if item.is_dir() and item.name.startswith("grouped_"):
-            job_count = 0
-            completed_count = 0
-            for f in item.iterdir():
-                if f.is_dir() and f.name.startswith("job_"):
-                    job_count += 1
-                    if (f / AUDIT_COMPLETE_MARKER).exists():
-                        completed_count += 1
-            created = datetime.fromtimestamp(item.stat().st_mtime).isoformat()
-            grouped_folders.append(GroupedFolderInfo(
-                name=item.name,
-                path=str(item),
-                job_count=job_count,
-                completed_jobs=completed_count,
-                pending_jobs=job_count - completed_count,
-                created=created
-            ))
-    grouped_folders.sort(key=lambda x: x.created, reverse=True)
-    return ListGroupedFoldersResponse(success=True, input_folder=str(input_folder), folders=grouped_folders)
+    # Directory scans are blocking I/O - keep them off the event loop
+    grouped_folders = await asyncio.to_thread(_scan_grouped_folders, input_folder)
+    response = ListGroupedFoldersResponse(success=True, input_folder=str(input_folder), folders=grouped_folders)
+    return _json_with_etag(request, response.model_dump())
 
 
-@router.get("/jobs")
-async def list_jobs(folder_name: str = Query(...)):
-    from ..au_audit import _load_existing_csv_results
+def _mtime_ns(path: Path) -> int | None:
+    """Return a file's st_mtime_ns, or None if it doesn't exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_run_metadata(grouped_folder: str, mtime_ns: int | None) -> Dict[str, Any] | None:
+    """Run metadata memoized per metadata file mtime (callers must not mutate it)."""
+    return _load_run_metadata(Path(grouped_folder))
 
-    input_folder = get_input_folder_path()
-    grouped_folder = input_folder / folder_name
-    if not grouped_folder.exists():
-        raise HTTPException(status_code=404, detail="Folder not found")
 
-    existing_metadata = _load_run_metadata(grouped_folder)
+@functools.lru_cache(maxsize=64)
+def _cached_csv_results(csv_path: str, mtime_ns: int | None) -> List[Dict[str, str]]:
+    """Parsed results CSV memoized per file mtime (callers must not mutate it)."""
+    return _load_existing_csv_results(Path(csv_path))
+
+
+def _scan_job_folder(job_folder: str | Path) -> Tuple[bool, bool]:
+    """Read a job folder once, returning (has completion marker, has any PDF).
+
+    Stops reading as soon as both are found.
+    """
+    is_completed = False
+    has_pdfs = False
+    with os.scandir(job_folder) as it:
+        for entry in it:
+            name = entry.name
+            if name == AUDIT_COMPLETE_MARKER:
+                is_completed = True
+            elif not has_pdfs and name.lower().endswith(".pdf"):
+                has_pdfs = True
+            if is_completed and has_pdfs:
+                break
+    return is_completed, has_pdfs
+
+
+def _scan_jobs(grouped_folder: Path) -> List[Dict[str, Any]]:
+    """Blocking scan of a grouped folder's jobs; runs in a worker thread."""
+    # Both files only change when a run writes them, so parse once per mtime
+    existing_metadata = _cached_run_metadata(
+        str(grouped_folder), _mtime_ns(grouped_folder / RUN_METADATA_FILE)
+    )
     existing_results = []
     if existing_metadata and existing_metadata.get("csv_path"):
         csv_p = Path(existing_metadata["csv_path"])
-        if csv_p.exists():
-            existing_results = _load_existing_csv_results(csv_p)
+        csv_mtime = _mtime_ns(csv_p)
+        if csv_mtime is not None:
+            existing_results = _cached_csv_results(str(csv_p), csv_mtime)
+
+    # Index rows by WAYBILL # / Entry # once; first matching row wins, as before
+    hawb_by_id: Dict[str, str] = {}
+    for row in existing_results:
+        waybill = row.get("WAYBILL #") or ""
+        for key in (waybill, row.get("Entry #") or ""):
+            if key:
+                hawb_by_id.setdefault(key, waybill)
+    # Keep only real overrides; every other job falls back to its own id
+    hawb_overrides = {job_id: hawb for job_id, hawb in hawb_by_id.items() if hawb and hawb != job_id}
+
+    # Only job folders are kept and sorted; dirent types avoid a stat per entry
+    with os.scandir(grouped_folder) as it:
+        job_entries = [e for e in it if e.name.startswith("job_") and e.is_dir(follow_symlinks=False)]
+    job_entries.sort(key=lambda e: e.name)
 
     jobs = []
-    for item in sorted(grouped_folder.iterdir()):
-        if item.is_dir() and item.name.startswith("job_"):
-            job_id = item.name.replace("job_", "")
-            is_completed = (item / AUDIT_COMPLETE_MARKER).exists()
-            pdfs = list(item.glob("*.pdf")) + list(item.glob("*.PDF"))
-
-            hawb = None
-            for row in existing_results:
-                if row.get("WAYBILL #") == job_id or row.get("Entry #") == job_id:
-                    hawb = row.get("WAYBILL #")
-                    break
-
-            jobs.append({
-                "job_id": job_id,
-                "hawb": hawb or job_id,
-                "status": "completed" if is_completed else "pending",
-                "has_pdfs": len(pdfs) > 0
-            })
+    for entry in job_entries:
+        job_id = entry.name.removeprefix("job_")
+        is_completed, has_pdfs = _scan_job_folder(entry.path)
 
-    return {
+        jobs.append({
+            "job_id": job_id,
+            "hawb": hawb_overrides.get(job_id, job_id),
+            "status": "completed" if is_completed else "pending",
+            "has_pdfs": has_pdfs
+        })
+    return jobs
+
+
+@router.get("/jobs")
+async def list_jobs(request: Request, folder_name: str = Query(...)):
+    input_folder = get_input_folder_path()
+    grouped_folder = input_folder / folder_name
+    if not grouped_folder.exists():
+        raise HTTPException(status_code=404, detail="Folder not found")
+
+    # Directory scans are blocking I/O - keep them off the event loop
+    jobs = await asyncio.to_thread(_scan_jobs, grouped_folder)
+
+    return _json_with_etag(request, {
         "success": True,
         "folder_name": folder_name,
         "jobs": jobs,
         "total": len(jobs),
         "completed": sum(1 for j in jobs if j["status"] == "completed"),
         "pending": sum(1 for j in jobs if j["status"] == "pending")
-    }
+    })
 
 
 @router.post("/process")
@@ -257,8 +391,11 @@ async def get_audit_status(folder_name: str = Query(..., description="Name of th
 
 
 @router.get("/result")
-async def get_audit_result(folder_name: str = Query(...)):
-    """Get the final result after audit completes. Returns full job details."""
+async def get_audit_result(
+    folder_name: str = Query(...),
+    include_results: bool = Query(True, description="Include per-job details (false returns counts and paths only)"),
+):
+    """Get the final result after audit completes. Returns full job details unless include_results=false."""
     if folder_name not in _active_audits:
         raise HTTPException(status_code=404, detail="No audit found for this folder. Start one with POST /process first.")
 
@@ -271,10 +408,24 @@ async def get_audit_result(folder_name: str = Query(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audit failed: {str(e)}") from e
 
+    # One pass over the results: tally outcomes and build the per-job rows together
+    successful = failed = skipped = 0
     job_results = []
     for job_data in result.get("results", []):
+        # Skipped jobs report success=True and count toward both tallies, as before
+        if job_data.get("skipped"):
+            skipped += 1
+        if job_data.get("success"):
+            successful += 1
+        elif not job_data.get("skipped"):
+            failed += 1
+
+        if not include_results:
+            continue
+
         row = job_data.get("row", {})
-        job_results.append(AUAuditJobResult(
+        # Fields come from our own result dicts - skip per-row validation
+        job_results.append(AUAuditJobResult.model_construct(
             job_id=job_data.get("job_id", ""),
             success=job_data.get("success", False),
             error=job_data.get("error"),
@@ -283,54 +434,71 @@ async def get_audit_result(folder_name: str = Query(...)):
                 "entry_number": row.get("Entry #", ""),
                 "waybill_number": row.get("WAYBILL #", ""),
             } if row else None,
-            header_validation={
-                "OC": row.get("OC", ""),
-                "SC": row.get("SC", ""),
-                "VALUATION": row.get("VALUATION", ""),
-                "ORIGIN": row.get("ORIGIN", ""),
-                "FTA": row.get("FTA", ""),
-                "PRS/PRT": row.get("PRS/PRT", ""),
-                "CURRENCY": row.get("CURRENCY", ""),
-                "INCOTERMS": row.get("INCOTERMS", ""),
-                "T & I": row.get("T & I", ""),
-                "OTH/DISC": row.get("OTH/DISC", ""),
-                "CP QUESTIONS": row.get("CP QUESTIONS", "1"),
-                "RELATED TRANSACTION": row.get("RELATED TRANSACTION", "1"),
-                "NOTES": row.get("NOTES", "1"),
-                "AQIS": row.get("AQIS", "1"),
-                "PERMITS": row.get("PERMITS", "1"),
-                "OTHER": row.get("OTHER", "1"),
-            } if row else None,
+            header_validation=_header_validation(row) if row else None,
             auditor_comments=row.get("FREE TEXT", "") if row else None,
         ))
 
-    return AUAuditBatchResponse(
+    response = AUAuditBatchResponse.model_construct(
         success=True,
         message=f"AU audit complete. Output: {result.get('run_path', '')}",
         run_id=result.get("run_id"),
         run_path=result.get("run_path"),
         total_jobs=result["total"],
-        successful_jobs=sum(1 for r in result["results"] if r.get("success")),
-        failed_jobs=sum(1 for r in result["results"] if not r.get("success") and not r.get("skipped")),
-        skipped_jobs=sum(1 for r in result["results"] if r.get("skipped")),
+        successful_jobs=successful,
+        failed_jobs=failed,
+        skipped_jobs=skipped,
         csv_path=result.get("csv_path"),
         xlsx_path=result.get("xlsx_path"),
         results=job_results
     )
+    # Dump once and let orjson render, instead of jsonable_encoder + json.dumps
+    return ORJSONResponse(response.model_dump())
 
 
-@router.get("/download-csv")
-async def download_csv(csv_path: str = Query(...)):
-    if not Path(csv_path).exists():
+def _resolve_download_path(file_path: str) -> Path | None:
+    """Resolve a requested download path, or None if it's outside the input/output trees.
+
+    Resolved on every request: symlinks may be repointed while the server runs.
+    """
+    resolved = Path(file_path).resolve()
+    for root in (get_output_base_dir(), get_input_folder_path()):
+        if resolved.is_relative_to(root.resolve()):
+            return resolved
+    return None
+
+
+def _file_download(request: Request, file_path: str, media_type: str) -> Response:
+    """Serve a report file, answering 304 when the client already has this version."""
+    path = _resolve_download_path(file_path)
+    if path is None:
+        raise HTTPException(status_code=403, detail="File is outside the audit folders")
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path=csv_path, filename=Path(csv_path).name, media_type="text/csv")
+
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Passing stat_result saves Starlette a second stat before it streams the file
+    return FileResponse(
+        path=path,
+        filename=path.name,
+        media_type=media_type,
+        stat_result=st,
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/download-csv")
+async def download_csv(request: Request, csv_path: str = Query(...)):
+    return _file_download(request, csv_path, "text/csv")
 
 
 @router.get("/download-xlsx")
-async def download_xlsx(xlsx_path: str = Query(...)):
-    if not Path(xlsx_path).exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path=xlsx_path, filename=Path(xlsx_path).name, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+async def download_xlsx(request: Request, xlsx_path: str = Query(...)):
+    return _file_download(request, xlsx_path, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
 
 @router.post("/clear-markers")
@@ -2,10 +2,18 @@
 Batch processing routes for document classification and organization.
 """
 from fastapi import APIRouter, UploadFile, HTTPException
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from typing import Any, Callable, Dict, List
+from pydantic import BaseModel, TypeAdapter
 import asyncio
-import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+import orjson
+from pydantic_ai.exceptions import ModelHTTPError
 from pathlib import Path
 
 from ..util.batch_processor import (
@@ -18,17 +26,186 @@ from ..util.batch_processor import (
 from ..document_classifier import classify_document, get_file_suffix
 # from ..document_extractor import extract_document_data  # Commented out - extraction not needed
 from ..checklist_validator import validate_all_checks
+from ..checklist_models import ChecklistValidationOutput, TariffLineItem, TariffLineValidation, load_checklist
 from ..file_manager import (
     get_next_run_id,
     create_run_directory,
     create_job_directory,
     save_classified_file,
+    save_classified_file_from_path,
     # save_extraction_json  # Commented out - extraction not needed
 )
 
 
+# Batch progress logging: records are queued and written to stdout by a
+# background listener thread, so request coroutines never block on stdout.
+# The listener thread is started/stopped with the app (see main.py).
+log = logging.getLogger("batch")
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_stream)
+log.addHandler(QueueHandler(_log_queue))
+log.setLevel(logging.INFO)
+log.propagate = False
+
+
+def start_batch_logging() -> None:
+    """Start the batch log listener thread (app startup)."""
+    _log_listener.start()
+
+
+def stop_batch_logging() -> None:
+    """Write out queued batch log records and stop the listener thread (app shutdown)."""
+    _log_listener.stop()
+
+
 router = APIRouter()
 
+# Transient LLM failures worth retrying: HTTP statuses, and message signals for
+# errors that don't carry a status (timeouts, SDK-level unavailability)
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_RETRYABLE_RE = re.compile(
+    r"\b(?:503|429)\b|timeout|timed out|unavailable|rate[_ ]?limit|quota|deadline|resource[_ ]exhausted",
+    re.IGNORECASE,
+)
+
+
+def _is_retryable(error: Exception, error_msg: str) -> bool:
+    """Check whether a classification error is transient."""
+    if isinstance(error, ModelHTTPError) and error.status_code in _RETRYABLE_STATUS_CODES:
+        return True
+    return isinstance(error, TimeoutError) or _RETRYABLE_RE.search(error_msg) is not None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff (1s, 2s, 4s...) with jitter so gathered retries don't sync up."""
+    return (2 ** (attempt - 1)) * (0.5 + random.random())
+
+
+def _write_json_atomic(path: Path, payload: Any, default: Callable[[Any], Any] | None = None) -> None:
+    """Write indented JSON via a sibling temp file + os.replace, so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(payload, default=default, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
+
+
+async def _validate_documents(region: str, documents: Dict[str, bytes], job_id: str) -> Dict[str, Any]:
+    """Run checklist validation, loading the checklist off the event loop first.
+
+    validate_all_checks is I/O-bound (three concurrent Gemini calls), so it stays on the loop;
+    its only blocking step is the first-use checklist file read + parse, which is cached after.
+    """
+    await asyncio.to_thread(load_checklist, region)
+    return await validate_all_checks(region=region, documents=documents, job_id=job_id)
+
+
+def _read_saved_documents(documents: Dict[str, str]) -> Dict[str, bytes]:
+    """Read a job's picked validation PDFs back from their saved copies."""
+    return {doc_type: Path(saved_path).read_bytes() for doc_type, saved_path in documents.items()}
+
+
+async def _validate_saved_documents(region: str, documents: Dict[str, str], job_id: str) -> Dict[str, Any]:
+    """Validate a job's saved PDFs (document type -> saved path) in a VALIDATE_SEMAPHORE slot.
+
+    The PDFs are only read once the slot is acquired and are released when it is, so
+    jobs queued for validation hold paths rather than file contents.
+    """
+    async with VALIDATE_SEMAPHORE:
+        pdf_documents = await asyncio.to_thread(_read_saved_documents, documents)
+        return await _validate_documents(region, pdf_documents, job_id)
+
+
+# List serializers for validation results, built once (one dump call per list instead of per item)
+_CHECKS_ADAPTER = TypeAdapter(List[ChecklistValidationOutput])
+_TARIFF_CHECKS_ADAPTER = TypeAdapter(List[TariffLineValidation])
+_TARIFF_LINES_ADAPTER = TypeAdapter(List[TariffLineItem])
+
+
+def _save_validation_outputs(
+    validation_results: Dict[str, Any],
+    job_id: str,
+    region: str,
+    validation_file_path: Path,
+    tariff_file_path: Path,
+) -> None:
+    """Serialize a job's validation results (and tariff lines, if any) and write them to disk.
+
+    Blocking; called via asyncio.to_thread so multi-MB dumps don't stall other jobs.
+    """
+    serializable_results = {
+        "job_id": job_id,
+        "region": region,
+        "header": _CHECKS_ADAPTER.dump_python(validation_results["header"]),
+        "valuation": _CHECKS_ADAPTER.dump_python(validation_results["valuation"]),
+        "summary": validation_results["summary"]
+    }
+    
+    # Add tariff validations if available
+    if validation_results.get("tariff_validations"):
+        serializable_results["tariff_line_checks"] = _TARIFF_CHECKS_ADAPTER.dump_python(validation_results["tariff_validations"])
+        serializable_results["tariff_summary"] = validation_results["tariff_summary"]
+    
+    _write_json_atomic(validation_file_path, serializable_results)
+    
+    # Save tariff line items separately if extraction was successful
+    if validation_results.get("tariff_lines"):
+        tariff_data = {
+            "job_id": job_id,
+            "total_lines": len(validation_results["tariff_lines"]),
+            "line_items": _TARIFF_LINES_ADAPTER.dump_python(validation_results["tariff_lines"])
+        }
+        _write_json_atomic(tariff_file_path, tariff_data)
+
+
+# Content type reported for local PDFs and uploads without one
+PDF_MEDIA_TYPE = "application/pdf"
+
+# Document types fed to checklist validation
+VALIDATION_DOCUMENT_TYPES = ("entry_print", "commercial_invoice", "air_waybill")
+
+# Bit per validation document type, so readiness checks are one mask test
+_DOC_TYPE_BITS = {doc_type: 1 << i for i, doc_type in enumerate(VALIDATION_DOCUMENT_TYPES)}
+_ALL_VALIDATION_DOCS = (1 << len(VALIDATION_DOCUMENT_TYPES)) - 1
+_REQUIRED_VALIDATION_DOCS = _DOC_TYPE_BITS["entry_print"] | _DOC_TYPE_BITS["commercial_invoice"]
+
+
+def _pick_validation_documents(results: List["ClassifiedFileInfo | None"]) -> tuple[Dict[str, str], int, bool]:
+    """
+    Pick a job's validation documents from its per-file results, in file order.
+    
+    The last file of each validation type wins, so the pick doesn't depend on
+    which classification finished first.
+    
+    Args:
+        results: Classified files in file order (None while still running)
+        
+    Returns:
+        (documents as type -> saved path, ready mask of picked types, settled) -
+        settled is False while a still-running file comes after a pick and could replace it
+    """
+    picks: Dict[str, int] = {}
+    last_pending = -1
+    for idx, cf in enumerate(results):
+        if cf is None:
+            last_pending = idx
+        elif cf.document_type in _DOC_TYPE_BITS:
+            picks[cf.document_type] = idx
+    documents = {doc_type: results[idx].saved_path for doc_type, idx in picks.items()}
+    ready_mask = 0
+    for doc_type in picks:
+        ready_mask |= _DOC_TYPE_BITS[doc_type]
+    settled = all(idx > last_pending for idx in picks.values())
+    return documents, ready_mask, settled
+
+# Caps on in-flight LLM calls across all batch requests, so jobs queue instead of
+# tripping provider rate limits (each validation makes 3 parallel Pro calls).
+# Waiters are woken first-come-first-served, so VALIDATE_SEMAPHORE is also the
+# shared validation queue: jobs from every batch get Pro slots in the order their
+# documents became ready.
+CLASSIFY_SEMAPHORE = asyncio.Semaphore(int(os.getenv("CLASSIFY_CONCURRENCY", "8")))
+VALIDATE_SEMAPHORE = asyncio.Semaphore(int(os.getenv("VALIDATE_CONCURRENCY", "4")))
+
 
 class FileInfo(BaseModel):
     """Basic file information."""
@@ -97,9 +274,9 @@ async def upload_batch(files: List[UploadFile]):
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
-    print("=" * 80, flush=True)
-    print(f"📤 BATCH UPLOAD - Received {len(files)} file(s)", flush=True)
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
+    log.info(f"📤 BATCH UPLOAD - Received {len(files)} file(s)")
+    log.info("=" * 80)
 
     # Group files by job ID
     grouped_jobs = group_files_by_job(files)
@@ -108,16 +285,17 @@ async def upload_batch(files: List[UploadFile]):
     total_files = len(files)
     total_jobs = len(grouped_jobs)
     
+    # Values are already typed - construct without re-running validation per file
     jobs_summary = []
     for job_id, job_files in grouped_jobs.items():
-        job_info = GroupedJobSummary(
+        job_info = GroupedJobSummary.model_construct(
             job_id=job_id,
             file_count=len(job_files),
             files=[
-                FileInfo(
+                FileInfo.model_construct(
                     filename=f.filename,
-                    size=f.size if hasattr(f, 'size') else None,
-                    content_type=f.content_type or "application/pdf"
+                    size=f.size,  # Always set by Starlette's UploadFile (None if unknown)
+                    content_type=f.content_type or PDF_MEDIA_TYPE
                 )
                 for f in job_files
             ]
@@ -125,15 +303,15 @@ async def upload_batch(files: List[UploadFile]):
         jobs_summary.append(job_info)
 
     # Log summary
-    print("\n📊 GROUPING RESULTS:", flush=True)
-    print(f"   Total files: {total_files}", flush=True)
-    print(f"   Total jobs: {total_jobs}", flush=True)
+    log.info("\n📊 GROUPING RESULTS:")
+    log.info(f"   Total files: {total_files}")
+    log.info(f"   Total jobs: {total_jobs}")
 
     # Log job summary (without individual file details)
     for job in jobs_summary:
-        print(f"   📁 Job {job.job_id}: {job.file_count} file(s)", flush=True)
+        log.info(f"   📁 Job {job.job_id}: {job.file_count} file(s)")
     
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
 
     summary = UploadBatchSummary(
         total_files=total_files,
@@ -157,13 +335,13 @@ async def group_local_input():
     Returns:
         UploadResponse with grouped jobs summary
     """
-    print("=" * 80, flush=True)
-    print("📂 SCANNING LOCAL INPUT FOLDER", flush=True)
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
+    log.info("📂 SCANNING LOCAL INPUT FOLDER")
+    log.info("=" * 80)
     
     # Get input folder path
     input_folder = get_input_folder_path()
-    print(f"   Input folder: {input_folder}", flush=True)
+    log.info(f"   Input folder: {input_folder}")
     
     if not input_folder.exists():
         raise HTTPException(
@@ -180,7 +358,7 @@ async def group_local_input():
             detail=f"No PDF files found in input folder: {input_folder}"
         )
     
-    print(f"\n📄 Found {len(pdf_files)} PDF file(s)", flush=True)
+    log.info(f"\n📄 Found {len(pdf_files)} PDF file(s)")
     
     # Group files by job ID
     grouped_jobs = group_local_files_by_job(pdf_files)
@@ -192,21 +370,22 @@ async def group_local_input():
     # Verify count matches - sum of all files in groups should equal total_files
     grouped_file_count = sum(len(job_files) for job_files in grouped_jobs.values())
     if grouped_file_count != total_files:
-        print(f"⚠️  WARNING: File count mismatch!", flush=True)
-        print(f"   Scanned PDFs: {total_files}", flush=True)
-        print(f"   Grouped files: {grouped_file_count}", flush=True)
-        print(f"   Difference: {total_files - grouped_file_count}", flush=True)
+        log.warning(f"⚠️  WARNING: File count mismatch!")
+        log.info(f"   Scanned PDFs: {total_files}")
+        log.info(f"   Grouped files: {grouped_file_count}")
+        log.info(f"   Difference: {total_files - grouped_file_count}")
     
+    # Values are already typed - construct without re-running validation per file
     jobs_summary = []
     for job_id, job_files in grouped_jobs.items():
-        job_info = GroupedJobSummary(
+        job_info = GroupedJobSummary.model_construct(
             job_id=job_id,
             file_count=len(job_files),
             files=[
-                FileInfo(
+                FileInfo.model_construct(
                     filename=f.name,
-                    size=f.stat().st_size if f.exists() else None,
-                    content_type="application/pdf"
+                    size=pdf_files.get(f),  # Size recorded during the scan
+                    content_type=PDF_MEDIA_TYPE
                 )
                 for f in job_files
             ]
@@ -214,19 +393,19 @@ async def group_local_input():
         jobs_summary.append(job_info)
     
     # Log summary
-    print("\n📊 GROUPING RESULTS:", flush=True)
-    print(f"   Total files scanned: {total_files}", flush=True)
-    print(f"   Total files grouped: {grouped_file_count}", flush=True)
-    print(f"   Total jobs: {total_jobs}", flush=True)
+    log.info("\n📊 GROUPING RESULTS:")
+    log.info(f"   Total files scanned: {total_files}")
+    log.info(f"   Total files grouped: {grouped_file_count}")
+    log.info(f"   Total jobs: {total_jobs}")
     
     # Log job summary (without individual file details)
     for job in jobs_summary:
-        print(f"   📁 Job {job.job_id}: {job.file_count} file(s)", flush=True)
+        log.info(f"   📁 Job {job.job_id}: {job.file_count} file(s)")
     
     # Organize files into job folders
     grouped_folder = organize_grouped_files(grouped_jobs, input_folder)
     
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
     
     summary = UploadBatchSummary(
         total_files=total_files,
@@ -263,14 +442,14 @@ async def process_local_input(region: str = "AU"):
     if region.upper() not in ["AU", "NZ"]:
         raise HTTPException(status_code=400, detail="Region must be 'AU' or 'NZ'")
 
-    print("=" * 80, flush=True)
-    print("🚀 PROCESSING LOCAL INPUT FOLDER", flush=True)
-    print(f"   Region: {region.upper()}", flush=True)
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
+    log.info("🚀 PROCESSING LOCAL INPUT FOLDER")
+    log.info(f"   Region: {region.upper()}")
+    log.info("=" * 80)
 
     # Step 1: Scan input folder
     input_folder = get_input_folder_path()
-    print(f"\n📂 Scanning input folder: {input_folder}", flush=True)
+    log.info(f"\n📂 Scanning input folder: {input_folder}")
     
     if not input_folder.exists():
         raise HTTPException(
@@ -286,45 +465,42 @@ async def process_local_input(region: str = "AU"):
             detail=f"No PDF files found in input folder: {input_folder}"
         )
     
-    print(f"   Found {len(pdf_files)} PDF file(s)", flush=True)
+    log.info(f"   Found {len(pdf_files)} PDF file(s)")
 
     # Step 2: Initialize run
     run_id = get_next_run_id()
     run_path = create_run_directory(run_id)
     
-    print(f"\n📂 Created run directory: {run_path}", flush=True)
-    print(f"   Run ID: {run_id}", flush=True)
-    print(f"   Region: {region.upper()}", flush=True)
+    log.info(f"\n📂 Created run directory: {run_path}")
+    log.info(f"   Run ID: {run_id}")
+    log.info(f"   Region: {region.upper()}")
 
     # Step 3: Group files by job
     grouped_jobs = group_local_files_by_job(pdf_files)
     
-    print(f"\n📊 Grouped into {len(grouped_jobs)} job(s)", flush=True)
+    log.info(f"\n📊 Grouped into {len(grouped_jobs)} job(s)")
 
     # Step 4: Process each job IN PARALLEL
-    print(f"\n🚀 Starting parallel processing of {len(grouped_jobs)} job(s)...", flush=True)
+    log.info(f"\n🚀 Starting parallel processing of {len(grouped_jobs)} job(s)...")
     
     async def process_single_job_local(job_id: str, job_files: List[Path]) -> ProcessedJobResult:
         """Process a single job with local file paths."""
-        print(f"\n{'='*80}", flush=True)
-        print(f"📁 Processing Job: {job_id} ({len(job_files)} files)", flush=True)
-        print(f"{'='*80}", flush=True)
+        log.info(f"\n{'='*80}")
+        log.info(f"📁 Processing Job: {job_id} ({len(job_files)} files)")
+        log.info(f"{'='*80}")
         
         # Create job directory
         job_path = create_job_directory(run_path, job_id)
-        print(f"   Created job folder: {job_path}", flush=True)
+        log.info(f"   Created job folder: {job_path}")
         
         # Classify and save each file IN PARALLEL
-        print(f"\n   🚀 Starting parallel classification of {len(job_files)} files...", flush=True)
+        log.info(f"\n   🚀 Starting parallel classification of {len(job_files)} files...")
         
         async def process_single_file_local(file_path: Path, idx: int) -> ClassifiedFileInfo:
             """Process a single local file with retry logic."""
-            print(f"\n   [{idx}/{len(job_files)}] Processing: {file_path.name}", flush=True)
+            log.info(f"\n   [{idx}/{len(job_files)}] Processing: {file_path.name}")
             
             try:
-                # Read file content
-                content = file_path.read_bytes()
-                
                 # Classify document with retry logic (3 total attempts)
                 max_retries = 3
                 classification = None
@@ -332,47 +508,44 @@ async def process_local_input(region: str = "AU"):
                 
                 for attempt in range(1, max_retries + 1):
                     try:
-                        print(f"      🔍 Classifying document... (attempt {attempt}/{max_retries})", flush=True)
-                        classification = await classify_document(content, file_path.name)
-                        print(f"      ✓ Type: {classification.document_type}", flush=True)
+                        log.info(f"      🔍 Classifying document... (attempt {attempt}/{max_retries})")
+                        # Read inside the slot so only CLASSIFY_CONCURRENCY PDFs are resident;
+                        # the labelled copy is made file-to-file and validation re-reads it
+                        async with CLASSIFY_SEMAPHORE:
+                            classification = await classify_document(
+                                await asyncio.to_thread(file_path.read_bytes), file_path.name
+                            )
+                        log.info(f"      ✓ Type: {classification.document_type}")
                         break  # Success, exit retry loop
                         
                     except Exception as classify_error:
                         last_error = classify_error
                         error_msg = str(classify_error)
                         
-                        # Check if it's a retryable error (503, timeout, etc.)
-                        is_retryable = (
-                            "503" in error_msg or
-                            "timeout" in error_msg.lower() or
-                            "unavailable" in error_msg.lower() or
-                            "rate" in error_msg.lower()
-                        )
-                        
-                        if attempt < max_retries and is_retryable:
-                            backoff_time = 2 ** (attempt - 1)  # Exponential backoff: 1s, 2s, 4s
-                            print(f"      ⚠️  Classification failed: {error_msg}", flush=True)
-                            print(f"      🔄 Retrying in {backoff_time}s... (attempt {attempt + 1}/{max_retries})", flush=True)
+                        if attempt < max_retries and _is_retryable(classify_error, error_msg):
+                            backoff_time = _backoff_seconds(attempt)
+                            log.warning(f"      ⚠️  Classification failed: {error_msg}")
+                            log.info(f"      🔄 Retrying in {backoff_time:.1f}s... (attempt {attempt + 1}/{max_retries})")
                             await asyncio.sleep(backoff_time)
                         else:
                             # Not retryable or final attempt
                             if attempt == max_retries:
-                                print(f"      ❌ All {max_retries} classification attempts failed", flush=True)
+                                log.error(f"      ❌ All {max_retries} classification attempts failed")
                             raise classify_error
                 
                 if classification is None:
                     raise last_error or Exception("Classification failed")
                 
                 # Save with label
-                print(f"      💾 Saving file...", flush=True)
-                saved_path = save_classified_file(
-                    content,
-                    file_path.name,
+                log.info(f"      💾 Saving file...")
+                saved_path = await asyncio.to_thread(
+                    save_classified_file_from_path,
+                    file_path,
                     classification.document_type,
                     job_path
                 )
                 
-                print(f"      ✓ Saved as: {saved_path.name}", flush=True)
+                log.info(f"      ✓ Saved as: {saved_path.name}")
                 
                 extracted_data = None
                 
@@ -385,53 +558,72 @@ async def process_local_input(region: str = "AU"):
                 )
                 
             except Exception as e:
-                print(f"      ❌ Error processing {file_path.name}: {e}", flush=True)
+                log.error(f"      ❌ Error processing {file_path.name}: {e}")
                 raise
         
-        # Process all files in parallel
+        async def run_validation(documents: Dict[str, str]) -> tuple[Dict[str, Any] | None, Path | None]:
+            """Validate the job's saved documents and save the results JSON."""
+            log.info(f"\n   ✅ Validating against {region.upper()} checklist...")
+            try:
+                validation_results = await _validate_saved_documents(region.upper(), documents, job_id)
+                
+                # Save validation results
+                validation_file = run_path / f"job_{job_id}_validation_{region.upper()}.json"
+                await asyncio.to_thread(_write_json_atomic, validation_file, validation_results, default=str)
+                
+                log.info(f"   ✓ Validation complete, saved to {validation_file.name}")
+                return validation_results, validation_file
+            except Exception as validation_error:
+                log.warning(f"   ⚠️  Validation failed: {validation_error}")
+                return None, None
+        
+        # Process all files in parallel. Validation documents are picked in file
+        # order (the last file of each type wins, independent of LLM latency) and
+        # read back from their saved copies. Once every validation type has
+        # a pick no still-running file could replace, validation starts while the
+        # rest of the job's files are still being classified.
         file_tasks = [
-            process_single_file_local(file_path, idx + 1)
+            asyncio.create_task(process_single_file_local(file_path, idx + 1))
             for idx, file_path in enumerate(job_files)
         ]
-        classified_files = await asyncio.gather(*file_tasks)
-        
-        print(f"\n   ✓ All {len(classified_files)} files classified and saved", flush=True)
+        task_index = {task: idx for idx, task in enumerate(file_tasks)}
+        results: List[ClassifiedFileInfo | None] = [None] * len(file_tasks)
+        validation_task = None
+        try:
+            pending = set(file_tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[task_index[task]] = task.result()
+                if validation_task is None:
+                    documents, ready_mask, settled = _pick_validation_documents(results)
+                    if settled and ready_mask == _ALL_VALIDATION_DOCS:
+                        validation_task = asyncio.create_task(run_validation(documents))
+        except BaseException:
+            # A failed file fails the job - stop its sibling LLM calls instead of
+            # paying for results that will be discarded (TaskGroup semantics)
+            siblings = file_tasks if validation_task is None else [*file_tasks, validation_task]
+            for task in siblings:
+                task.cancel()
+            # Wait for the cancellations so no task is left pending or unretrieved
+            await asyncio.gather(*siblings, return_exceptions=True)
+            raise
+        classified_files = [task.result() for task in file_tasks]
         
-        # Prepare documents for validation
-        documents: Dict[str, bytes] = {}
-        for cf in classified_files:
-            if cf.document_type == "entry_print":
-                file_path = Path(cf.saved_path)
-                documents["entry_print"] = file_path.read_bytes()
-            elif cf.document_type == "commercial_invoice":
-                file_path = Path(cf.saved_path)
-                documents["commercial_invoice"] = file_path.read_bytes()
-            elif cf.document_type == "air_waybill":
-                file_path = Path(cf.saved_path)
-                documents["air_waybill"] = file_path.read_bytes()
+        log.info(f"\n   ✓ All {len(classified_files)} files classified and saved")
         
         # Validate if we have the required documents
         validation_results = None
         validation_file = None
+        if validation_task is None:
+            documents, _, _ = _pick_validation_documents(classified_files)
         
-        if len(documents) >= 2:  # Need at least 2 document types
-            print(f"\n   ✅ Validating against {region.upper()} checklist...", flush=True)
-            try:
-                validation_results = await validate_all_checks(
-                    region=region.upper(),
-                    documents=documents
-                )
-                
-                # Save validation results
-                validation_file = run_path / f"job_{job_id}_validation_{region.upper()}.json"
-                with open(validation_file, 'w') as f:
-                    json.dump(validation_results, f, indent=2, default=str)
-                
-                print(f"   ✓ Validation complete, saved to {validation_file.name}", flush=True)
-            except Exception as validation_error:
-                print(f"   ⚠️  Validation failed: {validation_error}", flush=True)
+        if validation_task is not None:
+            validation_results, validation_file = await validation_task
+        elif len(documents) >= 2:  # Need at least 2 document types
+            validation_results, validation_file = await run_validation(documents)
         else:
-            print(f"\n   ⚠️  Skipping validation - need at least 2 document types (found {len(documents)})", flush=True)
+            log.warning(f"\n   ⚠️  Skipping validation - need at least 2 document types (found {len(documents)})")
         
         return ProcessedJobResult(
             job_id=job_id,
@@ -442,18 +634,23 @@ async def process_local_input(region: str = "AU"):
             validation_file=str(validation_file) if validation_file else None
         )
     
-    # Process all jobs in parallel
-    job_tasks = [
-        process_single_job_local(job_id, job_files)
-        for job_id, job_files in grouped_jobs.items()
-    ]
-    processed_jobs = await asyncio.gather(*job_tasks)
+    # Process all jobs in parallel; the first failure cancels the other jobs
+    try:
+        async with asyncio.TaskGroup() as tg:
+            job_tasks = [
+                tg.create_task(process_single_job_local(job_id, job_files))
+                for job_id, job_files in grouped_jobs.items()
+            ]
+    except ExceptionGroup as eg:
+        # Surface the original error, as gather() did
+        raise eg.exceptions[0]
+    processed_jobs = [task.result() for task in job_tasks]
     
-    print(f"\n{'='*80}", flush=True)
-    print(f"✅ BATCH PROCESSING COMPLETE", flush=True)
-    print(f"   Run ID: {run_id}", flush=True)
-    print(f"   Total jobs processed: {len(processed_jobs)}", flush=True)
-    print(f"{'='*80}", flush=True)
+    log.info(f"\n{'='*80}")
+    log.info(f"✅ BATCH PROCESSING COMPLETE")
+    log.info(f"   Run ID: {run_id}")
+    log.info(f"   Total jobs processed: {len(processed_jobs)}")
+    log.info(f"{'='*80}")
     
     total_files = sum(job.file_count for job in processed_jobs)
     
@@ -496,48 +693,49 @@ async def process_batch(
     if region.upper() not in ["AU", "NZ"]:
         raise HTTPException(status_code=400, detail="Region must be 'AU' or 'NZ'")
 
-    print("=" * 80, flush=True)
-    print(f"🚀 BATCH PROCESSING - Received {len(files)} file(s)", flush=True)
-    print(f"   Region: {region.upper()}", flush=True)
-    print("=" * 80, flush=True)
+    log.info("=" * 80)
+    log.info(f"🚀 BATCH PROCESSING - Received {len(files)} file(s)")
+    log.info(f"   Region: {region.upper()}")
+    log.info("=" * 80)
 
     # Step 1: Initialize run
     run_id = get_next_run_id()
     run_path = create_run_directory(run_id)
     
-    print(f"\n📂 Created run directory: {run_path}", flush=True)
-    print(f"   Run ID: {run_id}", flush=True)
-    print(f"   Region: {region.upper()}", flush=True)
+    log.info(f"\n📂 Created run directory: {run_path}")
+    log.info(f"   Run ID: {run_id}")
+    log.info(f"   Region: {region.upper()}")
 
     # Step 2: Group files by job
     grouped_jobs = group_files_by_job(files)
     
-    print(f"\n📊 Grouped into {len(grouped_jobs)} job(s)", flush=True)
+    log.info(f"\n📊 Grouped into {len(grouped_jobs)} job(s)")
 
     # Step 3: Process each job IN PARALLEL
-    print(f"\n🚀 Starting parallel processing of {len(grouped_jobs)} job(s)...", flush=True)
+    log.info(f"\n🚀 Starting parallel processing of {len(grouped_jobs)} job(s)...")
     
     async def process_single_job(job_id: str, job_files: List[UploadFile]) -> ProcessedJobResult:
         """Process a single job with all its files."""
-        print(f"\n{'='*80}", flush=True)
-        print(f"📁 Processing Job: {job_id} ({len(job_files)} files)", flush=True)
-        print(f"{'='*80}", flush=True)
+        log.info(f"\n{'='*80}")
+        log.info(f"📁 Processing Job: {job_id} ({len(job_files)} files)")
+        log.info(f"{'='*80}")
         
         # Create job directory
         job_path = create_job_directory(run_path, job_id)
-        print(f"   Created job folder: {job_path}", flush=True)
+        log.info(f"   Created job folder: {job_path}")
         
         # Classify and save each file IN PARALLEL
-        print(f"\n   🚀 Starting parallel classification of {len(job_files)} files...", flush=True)
+        log.info(f"\n   🚀 Starting parallel classification of {len(job_files)} files...")
         
         async def process_single_file(file: UploadFile, idx: int) -> ClassifiedFileInfo:
             """Process a single file with retry logic."""
-            print(f"\n   [{idx}/{len(job_files)}] Processing: {file.filename}", flush=True)
+            log.info(f"\n   [{idx}/{len(job_files)}] Processing: {file.filename}")
             
             try:
-                # Read file content
-                content = await file.read()
-                await file.seek(0)  # Reset for potential re-reading
+                # Read lazily inside the classify slot: until then the upload stays in
+                # Starlette's spooled temp file (on disk past 1 MB). The bytes are then
+                # held until the labelled copy is saved, and dropped during retry backoff.
+                content = None
                 
                 # Classify document with retry logic (3 total attempts)
                 max_retries = 3
@@ -546,73 +744,72 @@ async def process_batch(
                 
                 for attempt in range(1, max_retries + 1):
                     try:
-                        print(f"      🔍 Classifying document... (attempt {attempt}/{max_retries})", flush=True)
-                        classification = await classify_document(content, file.filename)
-                        print(f"      ✓ Type: {classification.document_type}", flush=True)
+                        log.info(f"      🔍 Classifying document... (attempt {attempt}/{max_retries})")
+                        async with CLASSIFY_SEMAPHORE:
+                            if content is None:
+                                content = await file.read()
+                            classification = await classify_document(content, file.filename)
+                        log.info(f"      ✓ Type: {classification.document_type}")
                         break  # Success, exit retry loop
                         
                     except Exception as classify_error:
                         last_error = classify_error
                         error_msg = str(classify_error)
                         
-                        # Check if it's a retryable error (503, timeout, etc.)
-                        is_retryable = (
-                            "503" in error_msg or
-                            "timeout" in error_msg.lower() or
-                            "unavailable" in error_msg.lower() or
-                            "rate" in error_msg.lower()
-                        )
-                        
-                        if attempt < max_retries and is_retryable:
-                            backoff_time = 2 ** (attempt - 1)  # Exponential backoff: 1s, 2s, 4s
-                            print(f"      ⚠️  Classification failed: {error_msg}", flush=True)
-                            print(f"      🔄 Retrying in {backoff_time}s... (attempt {attempt + 1}/{max_retries})", flush=True)
+                        if attempt < max_retries and _is_retryable(classify_error, error_msg):
+                            backoff_time = _backoff_seconds(attempt)
+                            log.warning(f"      ⚠️  Classification failed: {error_msg}")
+                            log.info(f"      🔄 Retrying in {backoff_time:.1f}s... (attempt {attempt + 1}/{max_retries})")
+                            # Don't hold the PDF while sleeping; the next slot reads it again
+                            content = None
+                            await file.seek(0)
                             await asyncio.sleep(backoff_time)
                         else:
                             # Not retryable or final attempt
                             if attempt == max_retries:
-                                print(f"      ❌ All {max_retries} classification attempts failed", flush=True)
+                                log.error(f"      ❌ All {max_retries} classification attempts failed")
                             raise classify_error
                 
                 if classification is None:
                     raise last_error or Exception("Classification failed")
                 
                 # Save with label
-                print(f"      💾 Saving file...", flush=True)
-                saved_path = save_classified_file(
+                log.info(f"      💾 Saving file...")
+                saved_path = await asyncio.to_thread(
+                    save_classified_file,
                     content,
                     file.filename,
                     classification.document_type,
                     job_path
                 )
                 
-                print(f"      ✓ Saved as: {saved_path.name}", flush=True)
+                log.info(f"      ✓ Saved as: {saved_path.name}")
                 
                 # Extract structured data for supported document types (COMMENTED OUT - not needed)
                 extracted_data = None
                 # if classification.document_type in ["entry_print", "commercial_invoice"]:
                 #     try:
-                #         print(f"      📊 Extracting structured data...", flush=True)
+                #         log.info(f"      📊 Extracting structured data...")
                 #         extraction_result = await extract_document_data(
                 #             content, 
                 #             file.filename, 
                 #             classification.document_type
                 #         )
                 #         extracted_data = extraction_result.model_dump()
-                #         print(f"      ✓ Extracted {len(extracted_data)} fields", flush=True)
+                #         log.info(f"      ✓ Extracted {len(extracted_data)} fields")
                 #         
                 #         # Save extracted data as JSON
-                #         print(f"      💾 Saving extraction JSON...", flush=True)
+                #         log.info(f"      💾 Saving extraction JSON...")
                 #         json_path = save_extraction_json(
                 #             extracted_data,
                 #             file.filename,
                 #             classification.document_type,
                 #             job_path
                 #         )
-                #         print(f"      ✓ Saved JSON as: {json_path.name}", flush=True)
+                #         log.info(f"      ✓ Saved JSON as: {json_path.name}")
                 #         
                 #     except Exception as extract_error:
-                #         print(f"      ⚠️  Extraction failed: {extract_error}", flush=True)
+                #         log.info(f"      ⚠️  Extraction failed: {extract_error}")
                 #         # Continue even if extraction fails
                 
                 return ClassifiedFileInfo(
@@ -624,7 +821,7 @@ async def process_batch(
                 )
                 
             except Exception as e:
-                print(f"      ❌ Error processing {file.filename}: {e}", flush=True)
+                log.error(f"      ❌ Error processing {file.filename}: {e}")
                 # Return error result instead of failing
                 return ClassifiedFileInfo(
                     original_filename=file.filename,
@@ -645,121 +842,92 @@ async def process_batch(
         validation_results = None
         validation_file_path = None
         
-        print(f"\n   📋 Running checklist validation for region {region.upper()}...", flush=True)
+        log.info(f"\n   📋 Running checklist validation for region {region.upper()}...")
         
         try:
-            # Load classified PDFs from job folder
-            documents = {}
-            entry_prints = []  # Collect all entry prints to choose the best one
+            # Pick classified PDFs from job folder (document type -> saved path);
+            # they are read back only once a validation slot is free
+            documents: Dict[str, str] = {}
+            ready_mask = 0
+            entry_prints: List[ClassifiedFileInfo] = []
             
             for classified_file in classified_files:
-                if classified_file.saved_filename and classified_file.document_type in ["entry_print", "commercial_invoice", "air_waybill"]:
-                    pdf_path = Path(classified_file.saved_path)
-                    if pdf_path.exists():
-                        pdf_bytes = pdf_path.read_bytes()
-                        
-                        if classified_file.document_type == "entry_print":
-                            # For entry_print, collect all of them (NZ may have E2 and SAD forms)
-                            entry_prints.append({
-                                "filename": classified_file.saved_filename,
-                                "bytes": pdf_bytes,
-                                "size": len(pdf_bytes)
-                            })
-                            print(f"      Loaded {classified_file.document_type} PDF ({len(pdf_bytes):,} bytes) - {classified_file.saved_filename}", flush=True)
-                        else:
-                            # For other docs, just add directly
-                            documents[classified_file.document_type] = pdf_bytes
-                            print(f"      Loaded {classified_file.document_type} PDF ({len(pdf_bytes):,} bytes)", flush=True)
+                if classified_file.saved_filename and classified_file.document_type in VALIDATION_DOCUMENT_TYPES:
+                    if classified_file.document_type == "entry_print":
+                        entry_prints.append(classified_file)
+                    else:
+                        # For other docs, just add directly
+                        documents[classified_file.document_type] = classified_file.saved_path
+                        ready_mask |= _DOC_TYPE_BITS[classified_file.document_type]
+                        log.info(f"      Found {classified_file.document_type} PDF - {classified_file.saved_filename}")
             
             # Handle multiple entry prints - prefer larger/more detailed ones
             if entry_prints:
+                sizes = await asyncio.to_thread(lambda: [os.path.getsize(cf.saved_path) for cf in entry_prints])
+                best_size, best_entry = max(zip(sizes, entry_prints), key=lambda pair: pair[0])
                 if len(entry_prints) > 1:
                     # Multiple entry prints found (e.g., NZ E2 + SAD forms)
                     # Prefer SAD (larger) over E2 (smaller summary)
-                    # Sort by size descending and take the largest
-                    entry_prints.sort(key=lambda x: x["size"], reverse=True)
-                    selected = entry_prints[0]
-                    print(f"      ℹ️  Multiple entry prints found ({len(entry_prints)}), using largest: {selected['filename']} ({selected['size']:,} bytes)", flush=True)
-                    documents["entry_print"] = selected["bytes"]
+                    log.info(f"      ℹ️  Multiple entry prints found ({len(entry_prints)}), using largest: {best_entry.saved_filename} ({best_size:,} bytes)")
                 else:
-                    # Only one entry print
-                    documents["entry_print"] = entry_prints[0]["bytes"]
+                    log.info(f"      Found entry_print PDF ({best_size:,} bytes) - {best_entry.saved_filename}")
+                documents["entry_print"] = best_entry.saved_path
+                ready_mask |= _DOC_TYPE_BITS["entry_print"]
             
             # Check if we have the required documents
-            if "entry_print" in documents and "commercial_invoice" in documents:
-                print(f"\n   🔄 Starting validation with {len(documents)} document(s)...", flush=True)
+            if ready_mask & _REQUIRED_VALIDATION_DOCS == _REQUIRED_VALIDATION_DOCS:
+                log.info(f"\n   🔄 Starting validation with {len(documents)} document(s)...")
                 
                 # Run validation (3 LLM calls in parallel: header + valuation + tariff extraction)
-                validation_results = await validate_all_checks(
-                    region=region.upper(),
-                    documents=documents,
-                    job_id=job_id
-                )
+                validation_results = await _validate_saved_documents(region.upper(), documents, job_id)
                 
                 # Save validation results to run folder root
                 validation_filename = f"job_{job_id}_validation_{region.upper()}.json"
                 validation_file_path = run_path / validation_filename
+                tariff_filename = f"job_{job_id}_tariff_lines.json"
                 
-                # Convert validation results to serializable format
-                serializable_results = {
-                    "job_id": job_id,
-                    "region": region.upper(),
-                    "header": [v.model_dump() for v in validation_results["header"]],
-                    "valuation": [v.model_dump() for v in validation_results["valuation"]],
-                    "summary": validation_results["summary"]
-                }
-                
-                # Add tariff validations if available
-                if validation_results.get("tariff_validations"):
-                    serializable_results["tariff_line_checks"] = [v.model_dump() for v in validation_results["tariff_validations"]]
-                    serializable_results["tariff_summary"] = validation_results["tariff_summary"]
-                
-                validation_file_path.write_text(json.dumps(serializable_results, indent=2, ensure_ascii=False))
+                # Model dumps + JSON encoding + writes for both files run in one worker thread
+                await asyncio.to_thread(
+                    _save_validation_outputs,
+                    validation_results,
+                    job_id,
+                    region.upper(),
+                    validation_file_path,
+                    run_path / tariff_filename,
+                )
                 
-                print(f"\n   ✅ Validation complete!", flush=True)
-                print(f"      Saved to: {validation_filename}", flush=True)
-                print(f"      Summary: {validation_results['summary']['passed']} PASS, "
+                log.info(f"\n   ✅ Validation complete!")
+                log.info(f"      Saved to: {validation_filename}")
+                log.info(f"      Summary: {validation_results['summary']['passed']} PASS, "
                           f"{validation_results['summary']['failed']} FAIL, "
                           f"{validation_results['summary']['questionable']} QUESTIONABLE, "
-                          f"{validation_results['summary'].get('not_applicable', 0)} N/A", flush=True)
+                          f"{validation_results['summary'].get('not_applicable', 0)} N/A")
                 
                 # Save tariff line items separately if extraction was successful
                 if validation_results.get("tariff_lines"):
-                    tariff_filename = f"job_{job_id}_tariff_lines.json"
-                    tariff_file_path = run_path / tariff_filename
-                    
-                    # Convert to serializable format
-                    tariff_data = {
-                        "job_id": job_id,
-                        "total_lines": len(validation_results["tariff_lines"]),
-                        "line_items": [item.model_dump() for item in validation_results["tariff_lines"]]
-                    }
-                    
-                    tariff_file_path.write_text(json.dumps(tariff_data, indent=2, ensure_ascii=False))
-                    
-                    print(f"\n   ✅ Tariff extraction complete!", flush=True)
-                    print(f"      Saved to: {tariff_filename}", flush=True)
-                    print(f"      Total line items: {len(validation_results['tariff_lines'])}", flush=True)
+                    log.info(f"\n   ✅ Tariff extraction complete!")
+                    log.info(f"      Saved to: {tariff_filename}")
+                    log.info(f"      Total line items: {len(validation_results['tariff_lines'])}")
                     
                     # Log tariff validation summary
                     if validation_results.get("tariff_validations"):
                         tariff_sum = validation_results["tariff_summary"]
-                        print(f"      Tariff validation: {tariff_sum['passed']} PASS, "
+                        log.info(f"      Tariff validation: {tariff_sum['passed']} PASS, "
                               f"{tariff_sum['failed']} FAIL, "
                               f"{tariff_sum['questionable']} QUESTIONABLE, "
-                              f"{tariff_sum.get('not_applicable', 0)} N/A", flush=True)
+                              f"{tariff_sum.get('not_applicable', 0)} N/A")
                 else:
-                    print(f"\n   ⚠️  No tariff lines extracted", flush=True)
+                    log.warning(f"\n   ⚠️  No tariff lines extracted")
             else:
                 missing = []
                 if "entry_print" not in documents:
                     missing.append("entry_print")
                 if "commercial_invoice" not in documents:
                     missing.append("commercial_invoice")
-                print(f"   ⚠️  Skipping validation - missing required documents: {', '.join(missing)}", flush=True)
+                log.warning(f"   ⚠️  Skipping validation - missing required documents: {', '.join(missing)}")
                 
         except Exception as validation_error:
-            print(f"   ❌ Validation failed: {validation_error}", flush=True)
+            log.error(f"   ❌ Validation failed: {validation_error}")
             # Continue even if validation fails
         
         # Build and return job result
@@ -772,7 +940,7 @@ async def process_batch(
             validation_file=str(validation_file_path) if validation_file_path else None
         )
         
-        print(f"\n   ✅ Job {job_id} complete: {len(classified_files)} files processed", flush=True)
+        log.info(f"\n   ✅ Job {job_id} complete: {len(classified_files)} files processed")
         return job_result
     
     # Process all jobs in parallel using asyncio.gather
@@ -784,7 +952,7 @@ async def process_batch(
     for i, result in enumerate(processed_jobs):
         if isinstance(result, Exception):
             job_id = list(grouped_jobs.keys())[i]
-            print(f"\n❌ Job {job_id} failed with error: {result}", flush=True)
+            log.error(f"\n❌ Job {job_id} failed with error: {result}")
         else:
             successful_jobs.append(result)
     
@@ -794,13 +962,13 @@ async def process_batch(
         for job in processed_jobs
     )
 
-    print(f"\n{'='*80}", flush=True)
-    print(f"🎉 BATCH PROCESSING COMPLETE", flush=True)
-    print(f"   Run ID: {run_id}", flush=True)
-    print(f"   Total files: {total_processed}/{len(files)}", flush=True)
-    print(f"   Total jobs: {len(processed_jobs)}", flush=True)
-    print(f"   Output: {run_path}", flush=True)
-    print(f"{'='*80}\n", flush=True)
+    log.info(f"\n{'='*80}")
+    log.info(f"🎉 BATCH PROCESSING COMPLETE")
+    log.info(f"   Run ID: {run_id}")
+    log.info(f"   Total files: {total_processed}/{len(files)}")
+    log.info(f"   Total jobs: {len(processed_jobs)}")
+    log.info(f"   Output: {run_path}")
+    log.info(f"{'='*80}\n")
 
     return ProcessBatchResponse(
         success=True,
@@ -3,12 +3,16 @@ Checklist management routes for viewing and editing AU/NZ checklists.
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import json
+import orjson
 from pathlib import Path
+from typing import Dict, Tuple
+import asyncio
 import logging
 
 import os
 
+from ..checklist_models import _checklist_cache
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,12 @@ else:
         logger.info(f"Using dev checklist directory: {CHECKLISTS_DIR}")
 
 
+# Parsed checklists keyed by region -> (st_mtime_ns, st_size, content); a stat() is the only
+# syscall on a hit. The per-region lock stops concurrent first hits from parsing twice.
+_CHECKLIST_CACHE: Dict[str, Tuple[int, int, dict]] = {}
+_CHECKLIST_LOCKS: Dict[str, asyncio.Lock] = {"AU": asyncio.Lock(), "NZ": asyncio.Lock()}
+
+
 class ChecklistUpdateRequest(BaseModel):
     """Request model for updating a checklist."""
     content: dict
@@ -55,12 +65,19 @@ async def get_checklist(region: str):
     
     checklist_file = CHECKLISTS_DIR / f"{region.lower()}_checklist.json"
     
-    if not checklist_file.exists():
+    try:
+        st = checklist_file.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Checklist file not found for region {region_upper}")
     
     try:
-        with open(checklist_file, 'r', encoding='utf-8') as f:
-            content = json.load(f)
+        async with _CHECKLIST_LOCKS[region_upper]:
+            cached = _CHECKLIST_CACHE.get(region_upper)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                content = cached[2]
+            else:
+                content = orjson.loads(await asyncio.to_thread(checklist_file.read_bytes))
+                _CHECKLIST_CACHE[region_upper] = (st.st_mtime_ns, st.st_size, content)
         
         logger.info(f"Retrieved checklist for region {region_upper}")
         return {
@@ -104,9 +121,12 @@ async def update_checklist(region: str, request: ChecklistUpdateRequest):
         if content["region"] != region_upper:
             raise ValueError(f"Region mismatch: checklist region '{content['region']}' does not match URL region '{region_upper}'")
         
-        # Write to file with pretty formatting
-        with open(checklist_file, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
+        # Write to file with pretty formatting (orjson emits UTF-8 bytes, same layout as indent=2)
+        checklist_file.write_bytes(orjson.dumps(content, option=orjson.OPT_INDENT_2))
+        
+        # Drop the parsed copies so the editor and the validator pick up the new checklist
+        _CHECKLIST_CACHE.pop(region_upper, None)
+        _checklist_cache.pop(region_upper, None)
         
         logger.info(f"Updated checklist for region {region_upper}")
         return {
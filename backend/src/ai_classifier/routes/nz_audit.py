@@ -127,7 +127,7 @@ async def list_jobs(folder_name: str = Query(...)):
     jobs = []
     for item in sorted(grouped_folder.iterdir()):
         if item.is_dir() and item.name.startswith("job_"):
-            job_id = item.name.replace("job_", "")
+            job_id = item.name.removeprefix("job_")
             is_completed = (item / AUDIT_COMPLETE_MARKER).exists()
             pdfs = list(item.glob("*.pdf")) + list(item.glob("*.PDF"))
 
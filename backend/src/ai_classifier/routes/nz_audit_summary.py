@@ -12,6 +12,7 @@ from pydantic import BaseModel
 from typing import List, Dict
 from pathlib import Path
 from datetime import datetime
+import asyncio
 import tempfile
 import shutil
 import os
@@ -100,7 +101,8 @@ async def generate_summary(
             month = datetime.now().strftime("%b-%y")
         
         # Generate summary
-        result = generate_nz_audit_summary(
+        result = await asyncio.to_thread(
+            generate_nz_audit_summary,
             input_path=input_path,
             output_path=output_path,
             month=month
@@ -217,7 +219,8 @@ async def generate_summary_from_path(
     
     try:
         # Generate summary
-        result = generate_nz_audit_summary(
+        result = await asyncio.to_thread(
+            generate_nz_audit_summary,
             input_path=input_file,
             output_path=Path(output_path) if output_path else None,
             month=month
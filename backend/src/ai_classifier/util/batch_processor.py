@@ -1,13 +1,15 @@
 """
 Batch processing module for grouping and managing audit job files.
 """
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from fastapi import UploadFile
 from pathlib import Path
+import functools
 import re
 import zipfile
 import os
 import shutil
+import stat
 from datetime import datetime
 
 
@@ -185,12 +187,12 @@ def summarize_grouped_jobs(grouped_jobs: Dict[str, List[UploadFile]]) -> Dict:
     return summary
 
 
-def group_local_files_by_job(file_paths: List[Path]) -> Dict[str, List[Path]]:
+def group_local_files_by_job(file_paths: Iterable[Path]) -> Dict[str, List[Path]]:
     """
     Group local file paths by job ID extracted from filename.
     
     Args:
-        file_paths: List of Path objects pointing to PDF files
+        file_paths: Paths to PDF files (a list, or the dict from scan_input_folder)
         
     Returns:
         Dictionary with job_id as key and list of file paths as value
@@ -208,7 +210,16 @@ def group_local_files_by_job(file_paths: List[Path]) -> Dict[str, List[Path]]:
     return jobs
 
 
-def scan_input_folder(input_folder: Path) -> List[Path]:
+def _regular_file_size(path: Path) -> int | None:
+    """Return the size of a regular file with one stat, or None for anything else."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+def scan_input_folder(input_folder: Path) -> Dict[Path, int]:
     """
     Scan input folder for PDF files, unpacking any zip files found.
     Recursively scans all subdirectories for PDFs (case-insensitive).
@@ -217,12 +228,13 @@ def scan_input_folder(input_folder: Path) -> List[Path]:
         input_folder: Path to the input folder
         
     Returns:
-        List of Path objects pointing to PDF files (including extracted ones)
+        Dict mapping each PDF path (including extracted ones) to its size in bytes.
+        Iterating it yields the paths, so it can be used wherever a list of paths is.
     """
-    pdf_files_set: set[Path] = set()
+    pdf_files: Dict[Path, int] = {}
     
     if not input_folder.exists():
-        return list(pdf_files_set)
+        return pdf_files
     
     # First, handle zip files and extract them
     zip_files = [item for item in input_folder.iterdir() if item.is_file() and item.suffix.lower() == '.zip']
@@ -240,10 +252,11 @@ def scan_input_folder(input_folder: Path) -> List[Path]:
                 # Find all PDFs in extracted folder (case-insensitive)
                 extracted_count = 0
                 for extracted_file in extract_dir.rglob('*'):
-                    if extracted_file.is_file():
-                        # Check extension case-insensitively
-                        if extracted_file.suffix.lower() == '.pdf':
-                            pdf_files_set.add(extracted_file.resolve())
+                    # Check extension case-insensitively before touching the disk
+                    if extracted_file.suffix.lower() == '.pdf':
+                        size = _regular_file_size(extracted_file)
+                        if size is not None:
+                            pdf_files[extracted_file.resolve()] = size
                             extracted_count += 1
                 
                 print(f"   ✓ Extracted {extracted_count} PDF file(s) from {zip_item.name}", flush=True)
@@ -253,22 +266,28 @@ def scan_input_folder(input_folder: Path) -> List[Path]:
     
     # Now recursively scan for all PDF files in the input folder (case-insensitive)
     # This will find PDFs that were already there, as well as extracted ones
+    # The single stat per PDF is kept so callers can report sizes without another syscall
     for item in input_folder.rglob('*'):
-        if item.is_file() and item.suffix.lower() == '.pdf':
+        if item.suffix.lower() == '.pdf':
             resolved = item.resolve()
-            if resolved not in pdf_files_set:
-                pdf_files_set.add(resolved)
+            if resolved not in pdf_files:
+                size = _regular_file_size(item)
+                if size is not None:
+                    pdf_files[resolved] = size
     
-    pdf_files = list(pdf_files_set)
     print(f"📊 Total PDF files found: {len(pdf_files)}", flush=True)
     
     return pdf_files
 
 
+@functools.lru_cache(maxsize=1)
 def get_input_folder_path() -> Path:
     """
     Get the input folder path, handling both Docker and local dev environments.
     
+    Cached: the answer only depends on the deployment layout, so the /app probe
+    runs once per process.
+    
     Returns:
         Path to the input folder
     """
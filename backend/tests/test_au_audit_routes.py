@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ai_classifier.au_audit import AUDIT_COMPLETE_MARKER
+from ai_classifier.routes import au_audit
+
+
+@pytest.fixture
+def input_folder(tmp_path, monkeypatch):
+    folder = tmp_path / "input"
+    for i in range(3):
+        (folder / "grouped_a" / f"job_{i}").mkdir(parents=True)
+    monkeypatch.setattr(au_audit, "get_input_folder_path", lambda: folder)
+    monkeypatch.setattr(au_audit, "get_output_base_dir", lambda: tmp_path / "output")
+    return folder
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(au_audit.router)
+    return TestClient(app)
+
+
+def test_grouped_folders_not_modified(client, input_folder):
+    first = client.get("/api/au-audit/grouped-folders")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get("/api/au-audit/grouped-folders", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+
+
+@pytest.mark.parametrize("header", ['"stale", {etag}', "{etag}, W/\"other\"", "*"])
+def test_grouped_folders_if_none_match_list(client, input_folder, header):
+    etag = client.get("/api/au-audit/grouped-folders").headers["etag"]
+    response = client.get("/api/au-audit/grouped-folders", headers={"If-None-Match": header.format(etag=etag)})
+    assert response.status_code == 304
+
+
+def test_grouped_folders_etag_changes_with_markers(client, input_folder):
+    first = client.get("/api/au-audit/grouped-folders")
+    folder = first.json()["folders"][0]
+    assert (folder["completed_jobs"], folder["pending_jobs"]) == (0, 3)
+
+    (input_folder / "grouped_a" / "job_0" / AUDIT_COMPLETE_MARKER).write_text("done")
+
+    second = client.get("/api/au-audit/grouped-folders", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    folder = second.json()["folders"][0]
+    assert (folder["completed_jobs"], folder["pending_jobs"]) == (1, 2)
+
+
+def test_jobs_not_modified(client, input_folder):
+    params = {"folder_name": "grouped_a"}
+    first = client.get("/api/au-audit/jobs", params=params)
+    assert first.json()["pending"] == 3
+    assert client.get("/api/au-audit/jobs", params=params, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+
+def test_download_not_modified_until_file_changes(client, input_folder):
+    csv_path = input_folder / "grouped_a" / "report.csv"
+    csv_path.write_text("HAWB\nH1\n", encoding="utf-8")
+    params = {"csv_path": str(csv_path)}
+
+    first = client.get("/api/au-audit/download-csv", params=params)
+    assert first.status_code == 200
+    assert first.headers["content-length"] == str(csv_path.stat().st_size)
+    etag = first.headers["etag"]
+
+    assert client.get("/api/au-audit/download-csv", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("H2\n")
+    changed = client.get("/api/au-audit/download-csv", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.text == "HAWB\nH1\nH2\n"
+
+
+def test_download_missing_file(client, input_folder):
+    missing = input_folder / "grouped_a" / "missing.xlsx"
+    assert client.get("/api/au-audit/download-xlsx", params={"xlsx_path": str(missing)}).status_code == 404
+
+
+def test_download_outside_audit_folders_forbidden(client, input_folder, tmp_path):
+    outside = tmp_path / "secret.csv"
+    outside.write_text("x", encoding="utf-8")
+    assert client.get("/api/au-audit/download-csv", params={"csv_path": str(outside)}).status_code == 403
+
+
+def test_download_symlink_repointed_outside_forbidden(client, input_folder, tmp_path):
+    inside = input_folder / "grouped_a" / "report.csv"
+    inside.write_text("HAWB\n", encoding="utf-8")
+    outside = tmp_path / "secret.csv"
+    outside.write_text("x", encoding="utf-8")
+    link = input_folder / "grouped_a" / "latest.csv"
+    link.symlink_to(inside)
+    params = {"csv_path": str(link)}
+    assert client.get("/api/au-audit/download-csv", params=params).status_code == 200
+
+    link.unlink()
+    link.symlink_to(outside)
+    assert client.get("/api/au-audit/download-csv", params=params).status_code == 403
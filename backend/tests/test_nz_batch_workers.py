@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ai_classifier import nz_audit
+
+
+def test_failed_worker_stops_siblings_before_finalizing(tmp_path, monkeypatch):
+    grouped = tmp_path / "grouped_1"
+    for job_id in ("a", "b", "c"):
+        (grouped / f"job_{job_id}").mkdir(parents=True)
+        (grouped / f"job_{job_id}" / "entry.pdf").write_bytes(b"%PDF-1.4")
+    run_path = tmp_path / "output" / "run_1"
+    run_path.mkdir(parents=True)
+    events: list[str] = []
+
+    def create_job_directory(run_path, job_id):
+        if job_id == "a":
+            raise OSError("disk full")
+        return run_path
+
+    async def run_nz_audit(job_id, **kwargs):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            events.append(f"cancelled {job_id}")
+            raise
+
+    real_finalize_csv = nz_audit.finalize_csv
+
+    def finalize_csv(path):
+        events.append("finalize_csv")
+        real_finalize_csv(path)
+
+    monkeypatch.setattr(nz_audit, "MAX_CONCURRENT_JOBS", 2)
+    monkeypatch.setattr(nz_audit, "get_next_run_id", lambda: "run_1")
+    monkeypatch.setattr(nz_audit, "create_run_directory", lambda run_id: run_path)
+    monkeypatch.setattr(nz_audit, "create_job_directory", create_job_directory)
+    monkeypatch.setattr(nz_audit, "run_nz_audit", run_nz_audit)
+    monkeypatch.setattr(nz_audit, "finalize_csv", finalize_csv)
+
+    async def run() -> None:
+        with pytest.raises(OSError, match="disk full"):
+            await nz_audit.process_grouped_jobs_nz(grouped)
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
+    assert events == ["cancelled b", "finalize_csv"]
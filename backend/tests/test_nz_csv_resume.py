@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+from pathlib import Path
+
+import pytest
+
+from ai_classifier import nz_audit
+from ai_classifier.nz_audit import (
+    CSV_FLUSH_INTERVAL,
+    FIELDNAMES,
+    MarkerSink,
+    append_csv_row,
+    create_csv_file_with_headers,
+    finalize_csv,
+)
+
+
+def _row(hawb: str, broker: str = "Broker") -> dict[str, str]:
+    row = dict.fromkeys(FIELDNAMES, "")
+    row["HAWB"] = hawb
+    row["Broker"] = broker
+    return row
+
+
+def _read_hawbs(csv_path: Path) -> list[str]:
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [r["HAWB"] for r in csv.DictReader(f)]
+
+
+def _crash(csv_path: Path) -> None:
+    """Drop the in-memory CSV state without flushing, as a killed process would."""
+    state = nz_audit._combined_csvs.pop(csv_path)
+    state.close()
+
+
+@pytest.fixture(autouse=True)
+def _reset_combined_csvs():
+    yield
+    for state in nz_audit._combined_csvs.values():
+        state.close()
+    nz_audit._combined_csvs.clear()
+
+
+def test_resume_after_partial_flush(tmp_path):
+    csv_path = create_csv_file_with_headers(tmp_path / "combined.csv")
+    flushed = [f"H{i}" for i in range(CSV_FLUSH_INTERVAL)]
+    for hawb in flushed + ["LOST1", "LOST2"]:
+        append_csv_row(_row(hawb), csv_path)
+    _crash(csv_path)
+
+    # Only the full batch reached disk
+    assert _read_hawbs(csv_path) == flushed
+
+    # Resume: the lost jobs are re-audited and one finished job is re-run
+    for hawb in ["LOST1", "LOST2"]:
+        append_csv_row(_row(hawb), csv_path)
+    append_csv_row(_row("H0", broker="Updated"), csv_path)
+    finalize_csv(csv_path)
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(r["HAWB"] for r in rows) == sorted(flushed + ["LOST1", "LOST2"])
+    assert next(r for r in rows if r["HAWB"] == "H0")["Broker"] == "Updated"
+    assert list(rows[0].keys()) == list(FIELDNAMES)
+
+
+def test_marker_flush_syncs_csv_first(tmp_path):
+    csv_path = create_csv_file_with_headers(tmp_path / "combined.csv")
+    job_folder = tmp_path / "job_1"
+    job_folder.mkdir()
+    marker = job_folder / nz_audit.AUDIT_COMPLETE_MARKER
+
+    sink = MarkerSink(csv_path, batch_size=1)
+    append_csv_row(_row("H1"), csv_path)
+    asyncio.run(sink.add(marker, "done"))
+
+    # The row is on disk before its marker, even though the CSV batch isn't full
+    assert marker.read_text(encoding="utf-8") == "done"
+    assert _read_hawbs(csv_path) == ["H1"]
+
+
+def test_marker_flush_fsyncs_each_folder_once(tmp_path, monkeypatch):
+    csv_path = create_csv_file_with_headers(tmp_path / "combined.csv")
+    synced: list[Path] = []
+    monkeypatch.setattr(nz_audit, "_fsync_dir", synced.append)
+    folders = [tmp_path / "job_1", tmp_path / "job_2"]
+    for folder in folders:
+        folder.mkdir()
+
+    async def run() -> None:
+        sink = MarkerSink(csv_path, batch_size=3)
+        await sink.add(folders[0] / nz_audit.AUDIT_COMPLETE_MARKER, "done")
+        await sink.add(folders[1] / nz_audit.AUDIT_COMPLETE_MARKER, "done")
+        assert synced == []
+        await sink.flush()
+
+    asyncio.run(run())
+    assert sorted(synced) == folders
+    assert all((folder / nz_audit.AUDIT_COMPLETE_MARKER).exists() for folder in folders)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+
+from openpyxl import load_workbook
+
+from ai_classifier import nz_audit
+from ai_classifier.nz_audit import FIELDNAMES, create_xlsx_file_with_headers, finalize_xlsx
+
+
+def _row(hawb: str) -> dict[str, str]:
+    row = dict.fromkeys(FIELDNAMES, "")
+    row["HAWB"] = hawb
+    row["Broker"] = "Jane Doe"
+    return row
+
+
+def _summary_hawbs(xlsx_path) -> list[str]:
+    wb = load_workbook(xlsx_path, read_only=True)
+    return [r[1] for r in wb["Summary"].iter_rows(min_row=2, values_only=True)]
+
+
+def test_finalize_from_rows_skips_open_workbook(tmp_path, monkeypatch):
+    xlsx_path = create_xlsx_file_with_headers(tmp_path / "combined.xlsx")
+    monkeypatch.setattr(nz_audit, "_load_open_workbook", None)  # must not be needed
+
+    asyncio.run(finalize_xlsx(xlsx_path, [_row("H1"), _row("H2")], [_row("H2")]))
+
+    assert _summary_hawbs(xlsx_path) == ["H1", "H2"]
+
+
+def test_finalize_without_rows_writes_unflushed(tmp_path):
+    xlsx_path = create_xlsx_file_with_headers(tmp_path / "combined.xlsx")
+
+    asyncio.run(finalize_xlsx(xlsx_path, None, [_row("H1")]))
+
+    assert _summary_hawbs(xlsx_path) == ["H1"]
+    assert xlsx_path not in nz_audit._open_workbooks